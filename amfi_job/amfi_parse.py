@@ -1,6 +1,36 @@
 from __future__ import annotations
 import io
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# New text file columns mapping
+RENAME_MAP = {
+    "Scheme Code": "scheme_code",
+    "Scheme Name": "scheme_name",
+    "ISIN Div Payout/ISIN Growth": "isin_po",
+    "ISIN Div Reinvestment": "isin_ri", 
+    "Net Asset Value": "nav_amt",
+    "Repurchase Price": "repurchase_price",
+    "Sale Price": "sale_price",
+    "Date": "nav_date",
+    # Keep legacy mappings for backward compatibility
+    "MF_Id": "mf_id",
+    "MF_Name": "mf_name",
+    "SchemeType_id": "scheme_type_id",
+    "SchemeType_Desc": "scheme_type_desc",
+    "SchemeCat_Id": "scheme_cat_id",
+    "SchemeCat_Desc": "scheme_cat_desc",
+    "Scheme_ID": "scheme_id",
+    "SD_Id": "scheme_code",
+    "NAV_Name": "nav_name",
+    "NAV_Date": "nav_date",
+    "NAV_Amt": "nav_amt",
+    "ISIN_RI": "isin_ri",
+    "ISIN_PO": "isin_po",
+}
 
 
 def _normalize_amfi_text(text: str) -> str:
@@ -42,7 +72,8 @@ def parse_nav_text(text: str) -> pd.DataFrame:
     Returns:
         DataFrame with normalized column names
     """
-    
+    import pandas as pd
+
     # Handle text content with semicolon separator
     if isinstance(text, str):
         buf = io.StringIO(_normalize_amfi_text(text))
@@ -56,33 +87,7 @@ def parse_nav_text(text: str) -> pd.DataFrame:
     cols = {c: c.strip() for c in df.columns}
     df.rename(columns=cols, inplace=True)
 
-    # New text file columns mapping
-    rename_map = {
-        "Scheme Code": "scheme_code",
-        "Scheme Name": "scheme_name",
-        "ISIN Div Payout/ISIN Growth": "isin_po",
-        "ISIN Div Reinvestment": "isin_ri", 
-        "Net Asset Value": "nav_amt",
-        "Repurchase Price": "repurchase_price",
-        "Sale Price": "sale_price",
-        "Date": "nav_date",
-        # Keep legacy mappings for backward compatibility
-        "MF_Id": "mf_id",
-        "MF_Name": "mf_name",
-        "SchemeType_id": "scheme_type_id",
-        "SchemeType_Desc": "scheme_type_desc",
-        "SchemeCat_Id": "scheme_cat_id",
-        "SchemeCat_Desc": "scheme_cat_desc",
-        "Scheme_ID": "scheme_id",
-        "SD_Id": "scheme_code",
-        "NAV_Name": "nav_name",
-        "NAV_Date": "nav_date",
-        "NAV_Amt": "nav_amt",
-        "ISIN_RI": "isin_ri",
-        "ISIN_PO": "isin_po",
-    }
-
-    for src, dst in rename_map.items():
+    for src, dst in RENAME_MAP.items():
         if src in df.columns:
             df.rename(columns={src: dst}, inplace=True)
 
@@ -110,7 +115,6 @@ def parse_nav_text(text: str) -> pd.DataFrame:
     # Parse nav_date to date format, supporting multiple formats
     if "nav_date" in df.columns:
         def parse_date(val):
-            import pandas as pd
             try:
                 # Try DD-MMM-YYYY (new format from portal)
                 return pd.to_datetime(val, format="%d-%b-%Y", errors="raise")
@@ -148,3 +152,9 @@ def parse_nav_text(text: str) -> pd.DataFrame:
 def minimal_nav(df: pd.DataFrame) -> pd.DataFrame:
     keep = [c for c in ["scheme_code", "scheme_name", "nav_amt", "nav_date"] if c in df.columns]
     return df[keep].copy()
+
+
+def scheme_meta_records(df: pd.DataFrame) -> list:
+    """(scheme_code, scheme_name, isin_po, isin_ri) tuples, which minimal_nav drops"""
+    cols = [df[c] if c in df.columns else [None] * len(df) for c in ["scheme_code", "scheme_name", "isin_po", "isin_ri"]]
+    return list(zip(*cols))
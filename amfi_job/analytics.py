@@ -0,0 +1,271 @@
+"""Returns and rolling analytics for all schemes at once.
+
+NAV history from daily_movement is loaded into a dense date x scheme NumPy
+matrix aligned on trading dates (the dates present in the collection).
+Only a tail of recent rows is kept, plus per-scheme running state (first
+NAV, running peak, max drawdown), so an update after each job run reads
+just the new dates from MongoDB. The state is persisted next to the report
+CSV in data/analytics_state.npz and metrics are upserted into
+reporting.scheme_analytics.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pymongo import UpdateOne
+
+from .config import Config
+from .db import DB
+from .utils import chunked
+
+STATE_PATH = Path(__file__).resolve().parent.parent / "data" / "analytics_state.npz"
+
+# Calendar lookbacks for point-to-point returns
+RETURN_WINDOWS = {"return1w": 7, "return1m": 30, "return1y": 365}
+VOL_WINDOW = 252  # trading rows for annualized volatility
+TAIL_DAYS = 400  # enough history for the 1y return and the volatility window
+
+
+class AnalyticsState:
+    """Tail of the date x scheme NAV matrix plus per-scheme running state"""
+
+    def __init__(self, dates: np.ndarray, codes: np.ndarray, nav: np.ndarray,
+                 first_date: np.ndarray, first_nav: np.ndarray,
+                 peak: np.ndarray, max_dd: np.ndarray):
+        self.dates = dates  # datetime64[D], ascending
+        self.codes = codes  # int64 scheme codes, one per column
+        self.nav = nav  # float64 (dates x codes), NaN where a scheme has no NAV
+        self.first_date = first_date
+        self.first_nav = first_nav
+        self.peak = peak
+        self.max_dd = max_dd
+
+    @classmethod
+    def empty(cls) -> "AnalyticsState":
+        return cls(
+            dates=np.array([], dtype="datetime64[D]"),
+            codes=np.array([], dtype=np.int64),
+            nav=np.empty((0, 0)),
+            first_date=np.array([], dtype="datetime64[D]"),
+            first_nav=np.array([]),
+            peak=np.array([]),
+            max_dd=np.array([]),
+        )
+
+    @property
+    def last_date(self) -> Optional[datetime]:
+        if len(self.dates) == 0:
+            return None
+        return self.dates[-1].astype("datetime64[s]").astype(datetime)
+
+    def save(self, path: Path = STATE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, dates=self.dates, codes=self.codes, nav=self.nav,
+                 first_date=self.first_date, first_nav=self.first_nav,
+                 peak=self.peak, max_dd=self.max_dd)
+
+    @classmethod
+    def load(cls, path: Path = STATE_PATH) -> Optional["AnalyticsState"]:
+        if not path.exists():
+            return None
+        with np.load(path) as f:
+            return cls(**{k: f[k] for k in f.files})
+
+
+def _ffill(mat: np.ndarray, seed: Optional[np.ndarray] = None) -> np.ndarray:
+    """Forward-fill NaNs down each column, optionally continuing from a seed row"""
+    if seed is not None:
+        mat = np.vstack([seed[None, :], mat])
+    idx = np.where(~np.isnan(mat), np.arange(mat.shape[0])[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    out = mat[idx, np.arange(mat.shape[1])]
+    return out[1:] if seed is not None else out
+
+
+def load_nav_matrix(db: DB, after: Optional[datetime] = None, until: Optional[datetime] = None):
+    """Read (Scheme Code, Date, nav) from daily_movement into a dense matrix
+
+    Returns (dates, codes, nav) with dates ascending and one column per code.
+    """
+    query: Dict[str, Any] = {"Date": {"$ne": None}}
+    if after is not None:
+        query["Date"]["$gt"] = after
+    if until is not None:
+        query["Date"]["$lte"] = until
+    code_list, date_list, nav_list = [], [], []
+    for d in db.daily_movement.find(query, {"_id": 0, "Scheme Code": 1, "Date": 1, "nav": 1}):
+        code = d.get("Scheme Code")
+        if not isinstance(code, int):
+            continue
+        nav = d.get("nav")
+        code_list.append(code)
+        date_list.append(d["Date"])
+        nav_list.append(np.nan if nav is None else nav)
+
+    if not code_list:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.int64), np.empty((0, 0))
+    dates, di = np.unique(np.array(date_list, dtype="datetime64[D]"), return_inverse=True)
+    codes, ci = np.unique(np.array(code_list, dtype=np.int64), return_inverse=True)
+    nav = np.full((len(dates), len(codes)), np.nan)
+    nav[di, ci] = np.array(nav_list, dtype=np.float64)
+    return dates, codes, nav
+
+
+def extend_state(state: AnalyticsState, dates: np.ndarray, codes: np.ndarray, nav: np.ndarray) -> AnalyticsState:
+    """Append newer rows to the state, updating running peak / drawdown / first NAV"""
+    if len(dates) == 0:
+        return state
+
+    # Union of scheme codes; new codes get NaN history
+    all_codes = np.union1d(state.codes, codes)
+    n = len(all_codes)
+    old_pos = np.searchsorted(all_codes, state.codes)
+    new_pos = np.searchsorted(all_codes, codes)
+
+    def widen(arr, fill, dtype=None):
+        out = np.full(n, fill, dtype=dtype or arr.dtype)
+        out[old_pos] = arr
+        return out
+
+    tail = np.full((len(state.dates), n), np.nan)
+    tail[:, old_pos] = state.nav
+    new = np.full((len(dates), n), np.nan)
+    new[:, new_pos] = nav
+    first_date = widen(state.first_date, np.datetime64("NaT"), "datetime64[D]")
+    first_nav = widen(state.first_nav, np.nan, np.float64)
+    peak = widen(state.peak, np.nan, np.float64)
+    max_dd = widen(state.max_dd, np.nan, np.float64)
+
+    # First NAV for schemes that start in the new rows
+    valid = ~np.isnan(new)
+    starts = np.isnan(first_nav) & valid.any(axis=0)
+    first_row = valid.argmax(axis=0)
+    cols = np.nonzero(starts)[0]
+    first_nav[cols] = new[first_row[cols], cols]
+    first_date[cols] = dates[first_row[cols]]
+
+    # Running peak and drawdown over the forward-filled new rows
+    seed = _ffill(tail)[-1] if len(tail) else None
+    filled = _ffill(new, seed)
+    cummax = np.fmax.accumulate(np.vstack([peak[None, :], filled]), axis=0)[1:]
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        dd = np.nanmin(filled / cummax - 1.0, axis=0)
+    max_dd = np.fmin(max_dd, dd)
+    peak = cummax[-1]
+
+    all_dates = np.concatenate([state.dates, dates])
+    mat = np.vstack([tail, new])
+    keep = all_dates >= all_dates[-1] - np.timedelta64(TAIL_DAYS, "D")
+    # Keep one row older than the window so lookbacks always have a base
+    keep[max(np.argmax(keep) - 1, 0)] = True
+    return AnalyticsState(all_dates[keep], all_codes, mat[keep], first_date, first_nav, peak, max_dd)
+
+
+def compute_metrics(state: AnalyticsState) -> Dict[str, np.ndarray]:
+    """Per-scheme metrics as of the last date in the state, one array entry per code"""
+    filled = _ffill(state.nav)
+    last = filled[-1]
+    asof = state.dates[-1]
+    out: Dict[str, np.ndarray] = {}
+
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        out["return1d"] = last / filled[-2] - 1.0 if len(filled) >= 2 else np.full_like(last, np.nan)
+        for name, days in RETURN_WINDOWS.items():
+            i = np.searchsorted(state.dates, asof - np.timedelta64(days, "D"), side="right") - 1
+            out[name] = last / filled[i] - 1.0 if i >= 0 else np.full_like(last, np.nan)
+
+        years = (asof - state.first_date).astype(np.float64) / 365.25
+        years[np.isnat(state.first_date) | (years <= 0)] = np.nan
+        out["cagr"] = np.power(last / state.first_nav, 1.0 / years) - 1.0
+
+        window = filled[-(VOL_WINDOW + 1):]
+        log_ret = np.diff(np.log(window), axis=0)
+        out["volatility1y"] = np.nanstd(log_ret, axis=0, ddof=1) * np.sqrt(252)
+
+        out["drawdown"] = last / state.peak - 1.0
+    out["maxDrawdown"] = state.max_dd
+    out["nav"] = last
+    return out
+
+
+def write_metrics(db: DB, state: AnalyticsState, metrics: Dict[str, np.ndarray], batch_size: int = 5000) -> int:
+    """Upsert metrics into reporting.scheme_analytics, one document per scheme
+
+    Documents of schemes that are no longer reported are deleted.
+    """
+    coll = db.db_reporting["scheme_analytics"]
+    asof = state.last_date
+    # Schemes with no NAV in the retained tail are no longer reported
+    active = ~np.isnan(state.nav).all(axis=0)
+    names = list(metrics)
+    ops: List[UpdateOne] = []
+    for j in np.nonzero(active)[0]:
+        doc: Dict[str, Any] = {"Scheme Code": int(state.codes[j]), "asOf": asof}
+        for name in names:
+            v = float(metrics[name][j])
+            doc[name] = None if np.isnan(v) else v
+        ops.append(UpdateOne({"Scheme Code": doc["Scheme Code"]}, {"$set": doc}, upsert=True))
+    for batch in chunked(ops, batch_size):
+        coll.bulk_write(batch, ordered=False)
+    # Drop stale docs so readers never see old returns under an old asOf
+    coll.delete_many({"Scheme Code": {"$nin": [int(c) for c in state.codes[active]]}})
+    return len(ops)
+
+
+def rebuild(db: DB, chunk_days: int = 365, verbose: bool = True) -> AnalyticsState:
+    """Recompute the state from full history, streaming it in date chunks"""
+    state = AnalyticsState.empty()
+    first = db.daily_movement.find_one({"Date": {"$ne": None}}, sort=[("Date", 1)])
+    latest = db.get_latest_date_from_daily_movement()
+    if not first or latest is None:
+        return state
+    after = first["Date"] - timedelta(days=1)
+    while after < latest:
+        until = after + timedelta(days=chunk_days)
+        state = extend_state(state, *load_nav_matrix(db, after, until))
+        if verbose:
+            print(f"Loaded history until {min(until, latest).strftime('%Y-%m-%d')}...")
+        after = until
+    return state
+
+
+def update(db: DB, full: bool = False, verbose: bool = True) -> dict:
+    """Extend the analytics with dates newer than the saved state and rewrite metrics
+
+    Falls back to a full rebuild when no state exists. Use full=True after
+    back-filling older dates (e.g. an archive import).
+    """
+    state = None if full else AnalyticsState.load()
+    if state is None or state.last_date is None:
+        state = rebuild(db, verbose=verbose)
+        mode = "rebuild"
+    else:
+        state = extend_state(state, *load_nav_matrix(db, after=state.last_date))
+        mode = "incremental"
+    if state.last_date is None:
+        return {"mode": mode, "schemes": 0}
+    state.save()
+    written = write_metrics(db, state, compute_metrics(state))
+    return {"mode": mode, "asOf": state.last_date.strftime("%Y-%m-%d"), "schemes": written}
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Compute returns / volatility / drawdown for all schemes")
+    parser.add_argument("--full", action="store_true", help="Recompute from full history instead of extending the saved state")
+    args = parser.parse_args(argv)
+    print(update(DB(Config.from_env()), full=args.full))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -1,10 +1,27 @@
 from datetime import datetime, timedelta
 import os
-from dataclasses import dataclass
-from dotenv import load_dotenv
+from dataclasses import dataclass, field, replace
+
+_dotenv_loaded = False
+
+
+def _load_dotenv():
+    """Load .env if present at repo root (once, on first Config.from_env)"""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+def _env(name: str, default: str):
+    # Resolved when a Config is created, i.e. after .env has been loaded
+    return field(default_factory=lambda: os.environ.get(name, default))
+
+
+def _env_flag(name: str):
+    return field(default_factory=lambda: os.environ.get(name, "").lower() in ("1", "true", "yes"))
 
-# Load .env if present at repo root
-load_dotenv()
 
 def convert_date_format(date_str: str) -> str:
     """Convert date from YYYY-MM-DD to DD-MMM-YYYY format
@@ -38,12 +55,18 @@ def get_amfi_url_for_date(date_str: str) -> str:
 @dataclass(frozen=True)
 class Config:
     mongodb_uri: str
-    db_reporting: str = os.environ.get("MONGODB_DB_REPORTING", "reporting")
-    db_mutualfunds: str = os.environ.get("MONGODB_DB_MUTUALFUNDS", "mutualFunds")
+    db_reporting: str = _env("MONGODB_DB_REPORTING", "reporting")
+    db_mutualfunds: str = _env("MONGODB_DB_MUTUALFUNDS", "mutualFunds")
     amfi_nav_url: str = ""  # Will be set dynamically per date
+    daily_movement_collection: str = _env("MONGODB_DAILY_MOVEMENT_COLLECTION", "daily_movement")
+    # Store daily_movement as a MongoDB time-series collection (Date / Scheme Code)
+    daily_movement_timeseries: bool = _env_flag("MONGODB_DAILY_MOVEMENT_TIMESERIES")
+    # "pandas" (default) or "fast" (pandas-free records engine)
+    ingest_engine: str = _env("AMFI_INGEST_ENGINE", "pandas")
 
     @staticmethod
     def from_env() -> "Config":
+        _load_dotenv()
         uri = os.environ.get("MONGODB_URI")
         if not uri:
             raise RuntimeError("MONGODB_URI env var is required")
@@ -51,9 +74,4 @@ class Config:
     
     def with_date(self, date_str: str) -> "Config":
         """Create a new Config instance with AMFI URL for the specified date"""
-        return Config(
-            mongodb_uri=self.mongodb_uri,
-            db_reporting=self.db_reporting,
-            db_mutualfunds=self.db_mutualfunds,
-            amfi_nav_url=get_amfi_url_for_date(date_str)
-        )
+        return replace(self, amfi_nav_url=get_amfi_url_for_date(date_str))
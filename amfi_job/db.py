@@ -1,16 +1,58 @@
 from __future__ import annotations
 from typing import Iterable, List, Dict, Any, Optional
-from pymongo import MongoClient, UpdateOne
-from datetime import datetime
+from pymongo import MongoClient, UpdateOne, ASCENDING, DESCENDING
+from pymongo.collection import Collection
+from datetime import datetime, timedelta
 
 from .config import Config
 
 
 class DB:
-    def __init__(self, cfg: Config):
-        self.client = MongoClient(cfg.mongodb_uri)
+    def __init__(self, cfg: Config, **client_kwargs):
+        self.client = MongoClient(cfg.mongodb_uri, **client_kwargs)
         self.db_reporting = self.client[cfg.db_reporting]
         self.db_mutual = self.client[cfg.db_mutualfunds]
+        self.daily_movement_name = cfg.daily_movement_collection
+        self.timeseries = cfg.daily_movement_timeseries
+        self._timeseries_ready: set = set()
+
+    @property
+    def daily_movement(self) -> Collection:
+        return self.db_mutual[self.daily_movement_name]
+
+    def ensure_daily_movement_timeseries(self, name: Optional[str] = None) -> Collection:
+        """Create daily_movement as a time-series collection if it does not exist yet
+
+        Date is the timeField and Scheme Code the metaField, so each bucket holds
+        one scheme's NAV history and is stored column-compressed. The check runs
+        once per collection per DB instance. An existing plain collection is an
+        error: the delete-and-insert writes are only meant for time-series data.
+        """
+        name = name or self.daily_movement_name
+        if name in self._timeseries_ready:
+            return self.db_mutual[name]
+        info = next(iter(self.db_mutual.list_collections(filter={"name": name})), None)
+        if info is not None and "timeseries" not in info.get("options", {}):
+            raise RuntimeError(
+                f"{self.db_mutual.name}.{name} exists but is not a time-series collection; "
+                f"migrate it with `python -m amfi_job.timeseries migrate --source {name} --target <new name>` "
+                "and point MONGODB_DAILY_MOVEMENT_COLLECTION at the target"
+            )
+        if info is None:
+            self.db_mutual.create_collection(
+                name,
+                timeseries={
+                    "timeField": "Date",
+                    "metaField": "Scheme Code",
+                    "granularity": "hours",
+                },
+            )
+        coll = self.db_mutual[name]
+        coll.create_index([("Scheme Code", ASCENDING), ("Date", ASCENDING)])
+        # Serves the Date-only sort in get_latest_date_from_daily_movement
+        coll.create_index([("Date", DESCENDING)])
+        self._timeseries_ready.add(name)
+        return coll
 
     def get_active_schemes(self) -> List[Dict[str, Any]]:
         coll = self.db_reporting["mf_activeSchemes"]
@@ -20,7 +62,7 @@ class DB:
     
     def get_latest_date_from_daily_movement(self) -> Optional[datetime]:
         """Get the latest date from the daily_movement collection"""
-        coll = self.db_mutual["daily_movement"]
+        coll = self.daily_movement
         # Find the document with the maximum Date field
         result = coll.find_one(
             {"Date": {"$ne": None}},  # Exclude null dates
@@ -31,7 +73,32 @@ class DB:
         return None
 
     def bulk_upsert_daily_movement(self, docs: Iterable[Dict[str, Any]]):
-        coll = self.db_mutual["daily_movement"]
+        docs = list(docs)
+        if self.timeseries:
+            result = self.replace_daily_movement_timeseries(docs)
+        else:
+            result = self._upsert_daily_movement(docs)
+        self.update_latest_nav(docs)
+        return result
+
+    def mark_daily_movement_updated(self):
+        """Record the time of the last completed ingest (used for cache invalidation)
+
+        Called once the daily_movement writes and the derived reporting
+        collections (weekly summary, analytics) are all up to date.
+        """
+        self.db_mutual["ingest_state"].update_one(
+            {"_id": self.daily_movement_name},
+            {"$set": {"updatedAt": datetime.utcnow()}},
+            upsert=True
+        )
+
+    def get_daily_movement_updated_at(self) -> Optional[datetime]:
+        doc = self.db_mutual["ingest_state"].find_one({"_id": self.daily_movement_name})
+        return doc.get("updatedAt") if doc else None
+
+    def _upsert_daily_movement(self, docs: List[Dict[str, Any]]):
+        coll = self.daily_movement
         ops = []
         for d in docs:
             key = {
@@ -46,20 +113,163 @@ class DB:
             return result.bulk_api_result
         return {"nUpserted": 0, "nModified": 0}
 
-    def generate_weekly_summary(self):
-        """Generate weekly NAV summary for current week"""
-        coll = self.db_mutual["daily_movement"]
+    @property
+    def latest_nav(self) -> Collection:
+        return self.db_mutual["latest_nav"]
+
+    def update_latest_nav(self, docs: Iterable[Dict[str, Any]]):
+        """Fold daily_movement docs into latest_nav (one doc per Scheme Code)
+
+        Current fields are replaced only when the incoming Date is the same or
+        newer; prevNav/prevDate track the next most recent close, so the result
+        does not depend on the order dates are ingested in.
+        """
+        ops = []
+        for d in docs:
+            date = d.get("Date")
+            code = d.get("Scheme Code")
+            if date is None or code is None:
+                continue
+            is_current = {"$gte": [date, "$Date"]}  # missing fields compare lowest
+            is_newer = {"$gt": [date, "$Date"]}
+            is_prev = {"$and": [{"$lt": [date, "$Date"]}, {"$gte": [date, "$prevDate"]}]}
+            current = {
+                f: {"$cond": [is_current, {"$literal": d.get(f)}, f"${f}"]}
+                for f in ("Scheme Name", "nav", "Date", "Active Units", "value")
+            }
+            ops.append(UpdateOne({"Scheme Code": code}, [
+                {"$set": {
+                    **current,
+                    "prevDate": {"$switch": {"branches": [
+                        {"case": is_newer, "then": "$Date"},
+                        {"case": is_prev, "then": {"$literal": date}},
+                    ], "default": "$prevDate"}},
+                    "prevNav": {"$switch": {"branches": [
+                        {"case": is_newer, "then": "$nav"},
+                        {"case": is_prev, "then": {"$literal": d.get("nav")}},
+                    ], "default": "$prevNav"}},
+                }},
+                {"$set": {
+                    "change": {"$cond": [
+                        {"$and": [{"$isNumber": "$nav"}, {"$isNumber": "$prevNav"}]},
+                        {"$subtract": ["$nav", "$prevNav"]},
+                        None,
+                    ]},
+                    "changePct": {"$cond": [
+                        {"$and": [{"$isNumber": "$nav"}, {"$isNumber": "$prevNav"}, {"$ne": ["$prevNav", 0]}]},
+                        {"$multiply": [{"$divide": [{"$subtract": ["$nav", "$prevNav"]}, "$prevNav"]}, 100]},
+                        None,
+                    ]},
+                }},
+            ], upsert=True))
+        if not ops:
+            return {"nUpserted": 0, "nModified": 0}
+        self.latest_nav.create_index([("Scheme Code", ASCENDING)], unique=True)
+        return self.latest_nav.bulk_write(ops, ordered=False).bulk_api_result
+
+    def rebuild_latest_nav(self):
+        """Recompute latest_nav from the full daily_movement history"""
         pipeline = [
-            {
-                "$match": {
-                    "$expr": {
-                        "$and": [
-                            {"$eq": [{"$isoWeekYear": "$Date"}, {"$isoWeekYear": datetime.now()}]},
-                            {"$eq": [{"$isoWeek": "$Date"}, {"$isoWeek": datetime.now()}]}
-                        ]
+            {"$match": {"Date": {"$ne": None}}},
+            {"$sort": {"Scheme Code": 1, "Date": -1}},
+            {"$group": {"_id": "$Scheme Code", "docs": {"$firstN": {"input": "$$ROOT", "n": 2}}}},
+            {"$project": {
+                "_id": 0,
+                "Scheme Code": "$_id",
+                "cur": {"$arrayElemAt": ["$docs", 0]},
+                "prev": {"$arrayElemAt": ["$docs", 1]},
+            }},
+            {"$project": {
+                "Scheme Code": 1,
+                "Scheme Name": "$cur.Scheme Name",
+                "nav": "$cur.nav",
+                "Date": "$cur.Date",
+                "Active Units": "$cur.Active Units",
+                "value": "$cur.value",
+                "prevDate": "$prev.Date",
+                "prevNav": "$prev.nav",
+                "change": {"$cond": [
+                    {"$and": [{"$isNumber": "$cur.nav"}, {"$isNumber": "$prev.nav"}]},
+                    {"$subtract": ["$cur.nav", "$prev.nav"]},
+                    None,
+                ]},
+                "changePct": {"$cond": [
+                    {"$and": [{"$isNumber": "$cur.nav"}, {"$isNumber": "$prev.nav"}, {"$ne": ["$prev.nav", 0]}]},
+                    {"$multiply": [{"$divide": [{"$subtract": ["$cur.nav", "$prev.nav"]}, "$prev.nav"]}, 100]},
+                    None,
+                ]},
+            }},
+            {"$merge": {
+                "into": "latest_nav",
+                "on": "Scheme Code",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }},
+        ]
+        self.latest_nav.create_index([("Scheme Code", ASCENDING)], unique=True)
+        return list(self.daily_movement.aggregate(pipeline, allowDiskUse=True))
+
+    def replace_daily_movement_timeseries(self, docs: Iterable[Dict[str, Any]], name: Optional[str] = None):
+        """Idempotent write path for the time-series collection
+
+        Time-series collections do not support upserts, so existing measurements
+        for the same (Scheme Code, Date) keys are deleted and the batch inserted.
+        Each doc carries the full field set, so this matches the $set upsert.
+        """
+        coll = self.ensure_daily_movement_timeseries(name)
+        by_date: Dict[Any, Dict[Any, Dict[str, Any]]] = {}
+        for d in docs:
+            if d.get("Date") is None:
+                # timeField is mandatory in time-series collections
+                print(f"[DEBUG] Skipping record without Date: {d}")
+                continue
+            # Last one wins, as with repeated upserts on the same key
+            by_date.setdefault(d["Date"], {})[d.get("Scheme Code")] = d
+        removed = inserted = 0
+        for date, rows in by_date.items():
+            removed += coll.delete_many({"Date": date, "Scheme Code": {"$in": list(rows)}}).deleted_count
+            inserted += len(coll.insert_many(list(rows.values()), ordered=False).inserted_ids)
+        return {"nInserted": inserted, "nRemoved": removed}
+
+    def get_latest_weekly_summary_week(self) -> Optional[tuple]:
+        """Return (Year, WeekOfYear) of the newest weekly_nav_summary entry"""
+        # Same target as the $merge stage in generate_weekly_summary
+        coll = self.client["reporting"]["weekly_nav_summary"]
+        doc = coll.find_one(
+            {},
+            {"_id": 0, "Year": 1, "WeekOfYear": 1},
+            sort=[("Year", -1), ("WeekOfYear", -1)]
+        )
+        if doc and doc.get("Year") is not None:
+            return (doc["Year"], doc["WeekOfYear"])
+        return None
+
+    def generate_weekly_summary(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """Generate weekly NAV summary for current week, or for every ISO week
+        overlapping [start, end] when a range is given (e.g. after an archive import)
+        """
+        coll = self.daily_movement
+        if start is not None and end is not None:
+            # Widen to whole ISO weeks so boundary weeks get complete Open/Close
+            week_start = datetime(start.year, start.month, start.day) - timedelta(days=start.weekday())
+            week_end = datetime(end.year, end.month, end.day) + timedelta(days=7 - end.weekday())
+            match_stages = [{"$match": {"Date": {"$gte": week_start, "$lt": week_end}}}]
+        else:
+            match_stages = [
+                # Plain range predicate first so indexes / time-series buckets can prune
+                {"$match": {"Date": {"$gte": datetime.now() - timedelta(days=8)}}},
+                {
+                    "$match": {
+                        "$expr": {
+                            "$and": [
+                                {"$eq": [{"$isoWeekYear": "$Date"}, {"$isoWeekYear": datetime.now()}]},
+                                {"$eq": [{"$isoWeek": "$Date"}, {"$isoWeek": datetime.now()}]}
+                            ]
+                        }
                     }
-                }
-            },
+                },
+            ]
+        pipeline = match_stages + [
             {
                 "$group": {
                     "_id": {
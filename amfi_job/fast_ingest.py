@@ -0,0 +1,184 @@
+"""Pandas-free ingest engine for AMFI NAV text files.
+
+Produces the same daily_movement documents as
+parse_nav_text -> minimal_nav -> merge_nav_with_active -> to_daily_movement_docs,
+using plain records and a dict hash join against the active schemes.
+"""
+from __future__ import annotations
+import csv
+import math
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from .amfi_parse import RENAME_MAP, _normalize_amfi_text
+
+
+# Tried in the same order as parse_nav_text
+_DATE_FORMATS = ("%d-%b-%Y", "%d-%m-%Y", "%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d")
+_INT_TEXT = re.compile(r"[+-]?\d+")
+
+
+class NavRow(NamedTuple):
+    scheme_code: int
+    scheme_name: str
+    nav: float  # int when every NAV in the file is integral, as pd.to_numeric infers
+    date: Optional[datetime]
+    isin_po: str = ""
+    isin_ri: str = ""
+
+
+def _to_int(val: Any) -> Optional[int]:
+    """Mirror pd.to_numeric(errors="coerce").astype("Int64") for a single value"""
+    if val is None:
+        return None
+    if isinstance(val, bool):
+        return int(val)
+    if isinstance(val, int):
+        return val
+    try:
+        f = float(str(val).strip())
+    except ValueError:
+        return None
+    if math.isnan(f) or not f.is_integer():
+        return None
+    return int(f)
+
+
+def _to_float(val: str) -> float:
+    try:
+        return float(val.replace(",", ""))
+    except ValueError:
+        return math.nan
+
+
+def _parse_date(val: str) -> Optional[datetime]:
+    if not val:
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(val, fmt)
+        except ValueError:
+            continue
+    # Same last resort as parse_nav_text; pandas is only imported for odd dates
+    import pandas as pd
+
+    ts = pd.to_datetime(val, errors="coerce")
+    return None if pd.isna(ts) else ts.to_pydatetime()
+
+
+def parse_nav_rows(text: str) -> List[NavRow]:
+    """Parse NAV text into NavRow records, dropping rows without a numeric scheme code
+
+    Like parse_nav_text, NAVs are ints when every line of the file (section
+    headings included) has an integer NAV, and floats otherwise.
+    """
+    lines = _normalize_amfi_text(text).split("\n")
+    reader = csv.reader(lines, delimiter=";")
+    header = next(reader, None)
+    if not header:
+        return []
+    columns = [RENAME_MAP.get(c.strip(), c.strip()) for c in header]
+    # Last occurrence wins, as with repeated DataFrame renames
+    idx = {name: i for i, name in enumerate(columns)}
+    i_code, i_name = idx.get("scheme_code"), idx.get("scheme_name")
+    i_nav, i_date = idx.get("nav_amt"), idx.get("nav_date")
+    i_po, i_ri = idx.get("isin_po"), idx.get("isin_ri")
+    if i_code is None:
+        return []
+
+    date_cache: Dict[str, Optional[datetime]] = {}
+    rows = []
+    int_navs = i_nav is not None
+    for fields in reader:
+        if int_navs and (i_nav >= len(fields) or not _INT_TEXT.fullmatch(fields[i_nav].strip().replace(",", ""))):
+            int_navs = False
+        if i_code >= len(fields):
+            continue
+        code = _to_int(fields[i_code])
+        if code is None:
+            continue
+        name = fields[i_name].strip() if i_name is not None and i_name < len(fields) else ""
+        nav = _to_float(fields[i_nav].strip()) if i_nav is not None and i_nav < len(fields) else math.nan
+        date = None
+        if i_date is not None and i_date < len(fields):
+            raw = fields[i_date].strip()
+            if raw not in date_cache:
+                date_cache[raw] = _parse_date(raw)
+            date = date_cache[raw]
+        po = fields[i_po].strip() if i_po is not None and i_po < len(fields) else ""
+        ri = fields[i_ri].strip() if i_ri is not None and i_ri < len(fields) else ""
+        rows.append(NavRow(code, name, nav, date, po, ri))
+    if int_navs:
+        rows = [r._replace(nav=int(r.nav)) for r in rows]
+    return rows
+
+
+def _isnull(val: Any) -> bool:
+    return val is None or (isinstance(val, float) and math.isnan(val))
+
+
+def _calculate_value(units: Any, nav: float) -> Optional[int]:
+    """Same rules as merge._calculate_value"""
+    if _isnull(units) or _isnull(nav):
+        return None
+    try:
+        au = float(str(units).replace(",", "").strip())
+        nv = float(str(nav).replace(",", "").strip())
+    except ValueError:
+        return None
+    return int(round(au * nv))
+
+
+def _active_units_column(active_schemes: List[Dict[str, Any]]) -> List[Any]:
+    """activeUnits as pd.DataFrame(active_schemes) would hold them
+
+    A numeric column becomes float64 once any scheme lacks units or has a
+    float, so ints turn into floats and missing units into NaN.
+    """
+    missing = object()
+    values = [a.get("activeUnits", missing) for a in active_schemes]
+    present = [v for v in values if v is not None and v is not missing]
+    numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present)
+    if present and numeric:
+        if len(present) < len(values) or any(isinstance(v, float) for v in present):
+            return [math.nan if v is None or v is missing else float(v) for v in values]
+        return values
+    return [math.nan if v is missing else v for v in values]
+
+
+def build_daily_movement_docs(rows: Iterable[NavRow], active_schemes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Hash join NAV rows against active schemes and build daily_movement documents"""
+    units_by_code: Dict[int, Any] = {}
+    for a, units in zip(active_schemes, _active_units_column(active_schemes)):
+        code = _to_int(a.get("categoryCode"))
+        if code is not None:
+            units_by_code[code] = units
+
+    # Keyed on (Scheme Code, Date); re-inserting moves a duplicate to the end,
+    # matching drop_duplicates(keep="last")
+    docs: Dict[tuple, Dict[str, Any]] = {}
+    for r in rows:
+        if r.scheme_code not in units_by_code:
+            continue
+        units = units_by_code[r.scheme_code]
+        iso = r.date.isocalendar() if r.date is not None else None
+        key = (r.scheme_code, r.date)
+        docs.pop(key, None)
+        docs[key] = {
+            "Scheme Code": r.scheme_code,
+            "Scheme Name": r.scheme_name,
+            "nav": r.nav,
+            "Date": r.date,
+            "Active Units": units,
+            "value": _calculate_value(units, r.nav),
+            "Week of Year": iso[1] if iso else None,
+            "Year": iso[0] if iso else None,
+        }
+
+    out = list(docs.values())
+    # pandas stores the value column as float64 once any value is missing
+    if any(d["value"] is None for d in out):
+        for d in out:
+            d["value"] = math.nan if d["value"] is None else float(d["value"])
+    return out
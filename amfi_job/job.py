@@ -1,17 +1,31 @@
 from __future__ import annotations
+import argparse
+import glob
+import gzip
+import os
 import sys
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
 from datetime import datetime, timedelta
 
 from .config import Config
-from .amfi_fetch import fetch_nav_text, DataNotAvailableError
-from .amfi_parse import parse_nav_text, minimal_nav
 from .db import DB
-from .merge import merge_nav_with_active, to_daily_movement_docs
 
+if TYPE_CHECKING:
+    from .scheme_index import SchemeIndex
+
+INGEST_ENGINES = ("pandas", "fast")
+
+
+def run_once_for_date(date_str: str, verbose: bool = True, engine: Optional[str] = None,
+                      index: Optional["SchemeIndex"] = None) -> Optional[dict]:
+    """Run the job for a specific date
+
+    A given SchemeIndex is updated in memory and left for the caller to
+    save; otherwise the index is loaded and saved around this date.
+    """
+    from .amfi_fetch import fetch_nav_text
 
-def run_once_for_date(date_str: str, verbose: bool = True) -> Optional[dict]:
-    """Run the job for a specific date"""
     cfg = Config.from_env().with_date(date_str)
 
     if verbose:
@@ -19,15 +33,72 @@ def run_once_for_date(date_str: str, verbose: bool = True) -> Optional[dict]:
     
     text = fetch_nav_text(cfg)
 
-    if verbose:
-        print("Parsing NAV file...")
-    nav_df = parse_nav_text(text)
-    nav_df = minimal_nav(nav_df)
-
     if verbose:
         print("Loading active schemes from MongoDB...")
+    from .scheme_index import SchemeIndex
+
     db = DB(cfg)
     active = db.get_active_schemes()
+    own_index = index is None
+    if own_index:
+        index = SchemeIndex.load(db)
+
+    result = ingest_nav_text(text, db, active, verbose, engine or cfg.ingest_engine, index)
+    if own_index:
+        index.save(db)
+
+    if verbose:
+        print(f"Done processing date: {date_str}")
+    return result
+
+
+def ingest_nav_text(text: str, db: DB, active: List[Dict[str, Any]], verbose: bool = True, engine: str = "pandas",
+                    index: Optional["SchemeIndex"] = None, scheme_meta: Optional[dict] = None) -> dict:
+    """Parse an AMFI NAV text, merge it with active schemes and upsert into daily_movement
+
+    When a SchemeIndex is given, it is updated in memory with the ISINs and
+    names of every scheme in the file, dated with the file's latest NAV
+    date so older files never overwrite newer metadata; the caller saves
+    it. A scheme_meta
+    dict is filled with the same metadata instead, for callers that merge
+    several files themselves. The result also carries minDate/maxDate, the
+    span of NAV dates parsed from the file.
+    """
+    if engine not in INGEST_ENGINES:
+        raise ValueError(f"Unknown ingest engine: {engine}")
+    if engine == "fast":
+        from .fast_ingest import parse_nav_rows, build_daily_movement_docs
+
+        if verbose:
+            print("Parsing NAV file (fast engine)...")
+        rows = parse_nav_rows(text)
+        span = _date_range([r.date for r in rows])
+        if index is not None or scheme_meta is not None:
+            records = [(r.scheme_code, r.scheme_name, r.isin_po, r.isin_ri) for r in rows]
+            _update_scheme_meta(records, span["maxDate"], index, scheme_meta, verbose)
+        if verbose:
+            print(f"Joining {len(rows)} nav rows with {len(active)} active schemes...")
+        docs = build_daily_movement_docs(rows, active)
+        if verbose:
+            print(f"Upserting {len(docs)} documents into mutualFunds.daily_movement...")
+        return {**db.bulk_upsert_daily_movement(docs), **span}
+
+    # pandas is only imported on this path
+    from .amfi_parse import parse_nav_text, minimal_nav, scheme_meta_records
+    from .merge import merge_nav_with_active, to_daily_movement_docs
+
+    if verbose:
+        print("Parsing NAV file...")
+    nav_df = parse_nav_text(text)
+    nav_dates = []
+    if "nav_date" in nav_df.columns:
+        parsed = nav_df["nav_date"].dropna()
+        if len(parsed):
+            nav_dates = [parsed.min().to_pydatetime(), parsed.max().to_pydatetime()]
+    span = _date_range(nav_dates)
+    if index is not None or scheme_meta is not None:
+        _update_scheme_meta(scheme_meta_records(nav_df), span["maxDate"], index, scheme_meta, verbose)
+    nav_df = minimal_nav(nav_df)
 
     if verbose:
         print(f"Merging {len(nav_df)} nav rows with {len(active)} active schemes...")
@@ -37,11 +108,28 @@ def run_once_for_date(date_str: str, verbose: bool = True) -> Optional[dict]:
 
     if verbose:
         print(f"Upserting {len(docs)} documents into mutualFunds.daily_movement...")
-    result = db.bulk_upsert_daily_movement(docs)
+    return {**db.bulk_upsert_daily_movement(docs), **span}
 
-    if verbose:
-        print(f"Done processing date: {date_str}")
-    return result
+
+def _date_range(dates: list) -> dict:
+    dates = [d for d in dates if d is not None]
+    return {
+        "minDate": min(dates) if dates else None,
+        "maxDate": max(dates) if dates else None,
+    }
+
+
+def _update_scheme_meta(records: list, asof: Optional[datetime], index: Optional["SchemeIndex"],
+                        scheme_meta: Optional[dict], verbose: bool):
+    from .scheme_index import scheme_meta_from_records
+
+    metas = scheme_meta_from_records(records)
+    if scheme_meta is not None:
+        scheme_meta.update(metas)
+    if index is not None:
+        changed = index.update(metas, asof)
+        if verbose:
+            print(f"Scheme index: {len(changed)} schemes added or changed")
 
 
 def _determine_start_date(latest_date: Optional[datetime], yesterday: datetime, verbose: bool) -> datetime:
@@ -58,12 +146,15 @@ def _determine_start_date(latest_date: Optional[datetime], yesterday: datetime,
     return start_date
 
 
-def _process_single_date(date_str: str, verbose: bool) -> Optional[dict]:
+def _process_single_date(date_str: str, verbose: bool, engine: Optional[str] = None,
+                         index: Optional["SchemeIndex"] = None) -> Optional[dict]:
     """Process a single date and return the result"""
+    from .amfi_fetch import DataNotAvailableError
+
     try:
         if verbose:
             print(f"\n--- Processing date: {date_str} ---")
-        result = run_once_for_date(date_str, verbose)
+        result = run_once_for_date(date_str, verbose, engine, index)
         if result:
             return {"date": date_str, "result": result}
     except DataNotAvailableError:
@@ -74,20 +165,33 @@ def _process_single_date(date_str: str, verbose: bool) -> Optional[dict]:
     return None
 
 
-def _process_date_range(start_date: datetime, yesterday: datetime, verbose: bool) -> list:
+def _process_date_range(db: DB, start_date: datetime, yesterday: datetime, verbose: bool,
+                        engine: Optional[str] = None) -> list:
     """Process all dates from start_date to yesterday"""
+    from .scheme_index import SchemeIndex
+
     if verbose:
         print(f"Will process dates from {start_date.strftime('%Y-%m-%d')} to {yesterday.strftime('%Y-%m-%d')} (inclusive)")
     
     total_results = []
     current_date = start_date
+    # Loaded once and saved once for the whole range
+    index = SchemeIndex.load(db)
     
     while current_date <= yesterday:
         date_str = current_date.strftime("%Y-%m-%d")
-        result = _process_single_date(date_str, verbose)
+        result = _process_single_date(date_str, verbose, engine, index)
         if result:
             total_results.append(result)
         current_date += timedelta(days=1)
+
+    if index.dirty and verbose:
+        print(f"\n--- Saving scheme index ({len(index.dirty)} schemes changed) ---")
+    try:
+        index.save(db)
+    except Exception as e:
+        # Changes are re-detected against the saved file on the next run
+        print(f"Error saving scheme index: {e}")
     
     if verbose:
         print(f"\n--- Completed processing. Processed {len(total_results)} dates ---")
@@ -95,7 +199,21 @@ def _process_date_range(start_date: datetime, yesterday: datetime, verbose: bool
     return total_results
 
 
-def run_once(verbose: bool = True) -> Optional[dict]:
+def _update_analytics(db: DB, full: bool, verbose: bool):
+    """Refresh reporting.scheme_analytics; failures do not fail the ingest"""
+    try:
+        from .analytics import update
+
+        if verbose:
+            print("\n--- Updating scheme analytics ---")
+        res = update(db, full=full, verbose=verbose)
+        if verbose:
+            print(f"Analytics updated: {res}")
+    except Exception as e:
+        print(f"Error updating analytics: {e}")
+
+
+def run_once(verbose: bool = True, engine: Optional[str] = None) -> Optional[dict]:
     """Run the job from latest date in DB until yesterday"""
     cfg = Config.from_env()
     db = DB(cfg)
@@ -114,13 +232,17 @@ def run_once(verbose: bool = True) -> Optional[dict]:
             print("Database is already up to date. No processing needed.")
         return {"message": "Database is up to date"}
     
-    total_results = _process_date_range(start_date, yesterday, verbose)
+    total_results = _process_date_range(db, start_date, yesterday, verbose, engine)
     
     if verbose:
         print("\n--- Generating weekly summary ---")
     db.generate_weekly_summary()
     if verbose:
         print("Weekly summary generated successfully")
+
+    if total_results:
+        _update_analytics(db, full=False, verbose=verbose)
+        db.mark_daily_movement_updated()
     
     return {
         "processed_dates": len(total_results),
@@ -128,11 +250,178 @@ def run_once(verbose: bool = True) -> Optional[dict]:
     }
 
 
+def get_status() -> dict:
+    """Report ingest state without fetching anything or importing pandas"""
+    db = DB(Config.from_env())
+    latest_date = db.get_latest_date_from_daily_movement()
+    yesterday = datetime.now() - timedelta(days=1)
+    start_date = _determine_start_date(latest_date, yesterday, verbose=False)
+
+    pending = []
+    current_date = start_date
+    while current_date <= yesterday:
+        pending.append(current_date.strftime("%Y-%m-%d"))
+        current_date += timedelta(days=1)
+
+    summary_week = db.get_latest_weekly_summary_week()
+    summary_fresh = (
+        summary_week is not None
+        and latest_date is not None
+        and summary_week >= tuple(latest_date.isocalendar())[:2]
+    )
+    return {
+        "latest_date": latest_date.strftime("%Y-%m-%d") if latest_date else None,
+        "pending_dates": pending,
+        "weekly_summary": {"year": summary_week[0], "week": summary_week[1]} if summary_week else None,
+        "weekly_summary_up_to_date": summary_fresh,
+    }
+
+
+def _expand_import_paths(paths: List[str]) -> List[str]:
+    """Expand directories and glob patterns into a sorted list of files"""
+    files = set()
+    for p in paths:
+        if os.path.isdir(p):
+            for name in os.listdir(p):
+                full = os.path.join(p, name)
+                if os.path.isfile(full) and name.endswith((".txt", ".txt.gz", ".gz")):
+                    files.add(full)
+        else:
+            files.update(f for f in glob.glob(p, recursive=True) if os.path.isfile(f))
+    return sorted(files)
+
+
+def _read_nav_file(path: str) -> str:
+    """Read a local AMFI NAV text file, transparently handling gzip"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as fh:
+        return fh.read()
+
+
+# Per-process state for import workers (DB connection and active scheme list)
+_import_state: Dict[str, Any] = {}
+
+
+def _init_import_worker(engine: Optional[str] = None):
+    cfg = Config.from_env()
+    db = DB(cfg)
+    _import_state["db"] = db
+    _import_state["active"] = db.get_active_schemes()
+    _import_state["engine"] = engine or cfg.ingest_engine
+
+
+def _import_file(path: str) -> dict:
+    """Ingest one archived file inside a worker process"""
+    try:
+        text = _read_nav_file(path)
+        # The file's full scheme metadata; the parent merges it by NAV date
+        scheme_meta: Dict[int, Any] = {}
+        result = ingest_nav_text(text, _import_state["db"], _import_state["active"], False, _import_state["engine"],
+                                 scheme_meta=scheme_meta)
+        # Keep counts only; upserted id lists are large and not useful per file
+        counts = {k: v for k, v in result.items() if not isinstance(v, list)}
+        return {"file": path, "ok": True, "result": counts, "scheme_meta": scheme_meta}
+    except Exception as e:
+        return {"file": path, "ok": False, "error": str(e)}
+
+
+def import_files(paths: List[str], workers: Optional[int] = None, verbose: bool = True, engine: Optional[str] = None) -> dict:
+    """Import archived AMFI NAV files from disk in parallel
+
+    Each worker process holds its own MongoDB connection and active scheme list.
+    Weekly summaries for every week spanned by the imported files are
+    regenerated once after all files are imported.
+    """
+    files = _expand_import_paths(paths)
+    if not files:
+        return {"message": "No files matched", "files": 0, "results": []}
+
+    results = []
+    # code -> ((NAV date, file), meta): metadata from the latest dated file wins,
+    # whatever order the files complete in or sort by name
+    latest_meta: Dict[int, tuple] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_import_worker, initargs=(engine,)) as pool:
+        futures = [pool.submit(_import_file, f) for f in files]
+        for i, fut in enumerate(as_completed(futures), start=1):
+            res = fut.result()
+            metas = res.pop("scheme_meta", None)
+            if metas:
+                order = (res["result"].get("maxDate") or datetime.min, res["file"])
+                for code, meta in metas.items():
+                    seen = latest_meta.get(code)
+                    if seen is None or seen[0] <= order:
+                        latest_meta[code] = (order, meta)
+            results.append(res)
+            if verbose:
+                status = "ok" if res["ok"] else f"FAILED: {res['error']}"
+                print(f"[{i}/{len(files)}] {res['file']}: {status}")
+
+    results.sort(key=lambda r: r["file"])
+    failed = [r for r in results if not r["ok"]]
+    if len(failed) < len(results):
+        from .scheme_index import SchemeIndex
+
+        db = DB(Config.from_env())
+        index = SchemeIndex.load(db)
+        # Grouped by NAV date so the index can skip anything older than what it holds
+        by_date: Dict[datetime, Dict[int, Any]] = {}
+        for code, ((date, _), meta) in latest_meta.items():
+            by_date.setdefault(date, {})[code] = meta
+        for date in sorted(by_date):
+            index.update(by_date[date], None if date == datetime.min else date)
+        if verbose:
+            print(f"\n--- Saving scheme index ({len(index.dirty)} schemes changed) ---")
+        try:
+            index.save(db)
+        except Exception as e:
+            # Every file is already upserted; summaries, analytics and the marker still run
+            print(f"Error saving scheme index: {e}")
+
+        dates = [r["result"][k] for r in results if r["ok"] for k in ("minDate", "maxDate")]
+        dates = [d for d in dates if d is not None]
+        if dates:
+            start, end = min(dates), max(dates)
+            if verbose:
+                print(f"\n--- Generating weekly summaries {start:%Y-%m-%d} to {end:%Y-%m-%d} ---")
+            db.generate_weekly_summary(start, end)
+        # Archives back-fill older dates, so analytics are recomputed from history
+        _update_analytics(db, full=True, verbose=verbose)
+        db.mark_daily_movement_updated()
+
+    return {
+        "files": len(files),
+        "imported": len(files) - len(failed),
+        "failed": len(failed),
+        "results": results,
+    }
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="AMFI daily NAV job")
+    sub = parser.add_subparsers(dest="command")
+    run = sub.add_parser("run", help="Fetch and upsert NAV data from the latest DB date until yesterday (default)")
+    run.add_argument("--engine", choices=INGEST_ENGINES, default=None, help="Ingest engine (default: AMFI_INGEST_ENGINE or pandas)")
+    sub.add_parser("status", help="Show latest ingested date, pending dates and weekly summary freshness")
+    imp = sub.add_parser("import", help="Import archived AMFI NAV text files (optionally .gz) from disk")
+    imp.add_argument("paths", nargs="+", help="Files, directories or glob patterns")
+    imp.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    imp.add_argument("-q", "--quiet", action="store_true", help="Do not print per-file progress")
+    imp.add_argument("--engine", choices=INGEST_ENGINES, default=None, help="Ingest engine (default: AMFI_INGEST_ENGINE or pandas)")
+
+    args = parser.parse_args(argv)
+    if args.command == "status":
+        res = get_status()
+    elif args.command == "import":
+        res = import_files(args.paths, workers=args.workers, verbose=not args.quiet, engine=args.engine)
+    else:
+        res = run_once(verbose=False, engine=getattr(args, "engine", None))
+    if res:
+        print(res)
+
+
 if __name__ == "__main__":
     try:
-        res = run_once(verbose=False)
-        if res:
-            print(res)
+        main()
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+import argparse
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import Config
+from .db import DB
+
+
+class LatestNavCache:
+    """Single and batched lookups on mutualFunds.latest_nav with an in-process TTL cache
+
+    Missing scheme codes are cached as None as well, so repeated lookups of
+    unknown codes do not hit MongoDB until the entry expires. Entries are
+    kept in expiry order: expired ones are pruned from the front on every
+    store, and the oldest are dropped beyond maxsize. Safe to share between
+    threads; MongoDB is queried outside the lock.
+    """
+
+    def __init__(self, db: DB, ttl: float = 300.0, maxsize: int = 50_000):
+        self.db = db
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._cache: OrderedDict = OrderedDict()  # code -> (expires, doc)
+        self._lock = threading.Lock()
+
+    def _get_cached(self, code, now: float):
+        entry = self._cache.get(code)
+        if entry is not None and entry[0] > now:
+            return True, entry[1]
+        return False, None
+
+    def _store(self, items: Iterable[tuple], now: float):
+        """Cache (code, doc) pairs; caller holds the lock"""
+        expires = now + self.ttl
+        for code, doc in items:
+            self._cache[code] = (expires, doc)
+            self._cache.move_to_end(code)
+        while self._cache and next(iter(self._cache.values()))[0] <= now:
+            self._cache.popitem(last=False)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def get(self, code) -> Optional[Dict[str, Any]]:
+        return self.get_many([code]).get(code)
+
+    def get_many(self, codes: Iterable) -> Dict[Any, Optional[Dict[str, Any]]]:
+        now = time.monotonic()
+        out: Dict[Any, Optional[Dict[str, Any]]] = {}
+        missing: List = []
+        with self._lock:
+            for code in codes:
+                hit, doc = self._get_cached(code, now)
+                if hit:
+                    out[code] = doc
+                else:
+                    missing.append(code)
+        if missing:
+            found = {
+                d["Scheme Code"]: d
+                for d in self.db.latest_nav.find({"Scheme Code": {"$in": missing}}, {"_id": 0})
+            }
+            for code in missing:
+                out[code] = found.get(code)
+            with self._lock:
+                self._store(((code, out[code]) for code in missing), now)
+        return out
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Latest NAV for every scheme; refreshes the cache for all of them"""
+        docs = list(self.db.latest_nav.find({}, {"_id": 0}).sort("Scheme Code", 1))
+        with self._lock:
+            self._store(((d["Scheme Code"], d) for d in docs), time.monotonic())
+        return docs
+
+    def invalidate(self, codes: Optional[Iterable] = None):
+        with self._lock:
+            if codes is None:
+                self._cache.clear()
+            else:
+                for code in codes:
+                    self._cache.pop(code, None)
+
+    def __len__(self):
+        return len(self._cache)
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Latest NAV per scheme")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Recompute latest_nav from the full daily_movement history")
+    get = sub.add_parser("get", help="Show latest NAV for scheme codes")
+    get.add_argument("codes", nargs="+", type=int)
+
+    args = parser.parse_args(argv)
+    db = DB(Config.from_env())
+    if args.command == "rebuild":
+        db.rebuild_latest_nav()
+        print(f"latest_nav rebuilt: {db.latest_nav.estimated_document_count()} schemes")
+    else:
+        for code, doc in LatestNavCache(db).get_many(args.codes).items():
+            print(code, doc)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
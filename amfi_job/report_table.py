@@ -1,20 +1,19 @@
 from __future__ import annotations
 import pandas as pd
 from pathlib import Path
+from typing import Optional
 from .config import Config
 from .db import DB
 
-def fetch_table():
-    cfg = Config.from_env()
-    db = DB(cfg)
-    coll = db.db_mutual["daily_movement"]
-    # Get date for last 10 days with data
-    min_date = pd.Timestamp.now() - pd.Timedelta(days=10)
+def build_value_table(db: DB, days: int = 10) -> Optional[pd.DataFrame]:
+    """Scheme family x date value table with a leading Change column and a TOTAL row"""
+    coll = db.daily_movement
+    # Get date for last `days` days with data
+    min_date = pd.Timestamp.now() - pd.Timedelta(days=days)
     # Get the latest 7 unique dates (from nested Date)
     docs = list(coll.find({"Date": {"$gte": min_date}}, {"_id": 0, "Scheme Name": 1, "Date": 1, "value": 1}).sort("Date", -1))
     if not docs:
-        print("No data found.")
-        return
+        return None
     df = pd.DataFrame(docs)
     
     # Normalize scheme names before pivot to group similar schemes
@@ -80,8 +79,17 @@ def fetch_table():
     else:
         total_change = int(0)
     total_series = pd.Series({"Change": total_change}, name="TOTAL")
-    total_series = pd.concat([total_series, total_row])
-    numeric_with_total = pd.concat([numeric, total_series.to_frame().T])
+    total_series = pd.concat([total_series, total_row]).rename("TOTAL")
+    return pd.concat([numeric, total_series.to_frame().T])
+
+
+def fetch_table():
+    cfg = Config.from_env()
+    db = DB(cfg)
+    numeric_with_total = build_value_table(db)
+    if numeric_with_total is None:
+        print("No data found.")
+        return
 
     # Save numeric CSV to data folder (overwrite)
     data_dir = (Path(__file__).resolve().parent.parent / "data")
@@ -0,0 +1,283 @@
+"""ISIN and scheme-name lookup index built from parsed NAV files.
+
+Keeps scheme metadata (name, ISIN payout/growth, ISIN reinvestment) per
+scheme code with in-memory indexes for exact ISIN lookups and prefix
+search over normalized names and name tokens. Ingest feeds it the
+metadata of every parsed file together with the file's NAV date; only
+schemes whose metadata changed are re-indexed and written to
+data/scheme_index.json and mutualFunds.scheme_meta. Metadata from an older
+NAV date than the stored one (e.g. an archive import) is ignored.
+
+    python -m amfi_job.scheme_index INF209KA12Z1
+    python -m amfi_job.scheme_index "aditya birla bank"
+"""
+from __future__ import annotations
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_left, insort
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from .config import Config
+from .db import DB
+from .utils import chunked
+
+INDEX_PATH = Path(__file__).resolve().parent.parent / "data" / "scheme_index.json"
+
+# (Scheme Name, ISIN Div Payout/ISIN Growth, ISIN Div Reinvestment)
+SchemeMeta = Tuple[str, Optional[str], Optional[str]]
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_ISIN = re.compile(r"^[A-Z]{2}[A-Z0-9]{9}[0-9]$")
+_BULK_REBUILD = 1000  # changed schemes above which the index is rebuilt wholesale
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(_NON_ALNUM.sub(" ", name.lower()).split())
+
+
+def clean_isin(val: Any) -> Optional[str]:
+    val = str(val or "").strip().upper()
+    return val if _ISIN.match(val) else None
+
+
+def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    lo = bisect_left(keys, prefix)
+    return lo, bisect_left(keys, prefix + "\uffff", lo)
+
+
+class SchemeIndex:
+    """In-memory ISIN map plus sorted name/token keys for bisect prefix search"""
+
+    def __init__(self):
+        self.meta: Dict[int, SchemeMeta] = {}
+        self.asof: Dict[int, Optional[datetime]] = {}  # NAV date each scheme's meta was taken from
+        self.isin: Dict[str, int] = {}
+        self._names: List[Tuple[str, int]] = []  # sorted (normalized name, code)
+        self._name_keys: List[str] = []
+        self._tokens: Dict[str, Set[int]] = {}
+        self._token_keys: List[str] = []  # sorted unique tokens
+        self.dirty: Set[int] = set()
+
+    def __len__(self):
+        return len(self.meta)
+
+    def _add(self, code: int, meta: SchemeMeta):
+        name, po, ri = meta
+        for isin in (po, ri):
+            if isin:
+                self.isin[isin] = code
+        norm = normalize_name(name)
+        i = bisect_left(self._names, (norm, code))
+        self._names.insert(i, (norm, code))
+        self._name_keys.insert(i, norm)
+        for tok in set(norm.split()):
+            codes = self._tokens.get(tok)
+            if codes is None:
+                self._tokens[tok] = codes = set()
+                insort(self._token_keys, tok)
+            codes.add(code)
+
+    def _remove(self, code: int, meta: SchemeMeta):
+        name, po, ri = meta
+        for isin in (po, ri):
+            if isin and self.isin.get(isin) == code:
+                del self.isin[isin]
+        norm = normalize_name(name)
+        i = bisect_left(self._names, (norm, code))
+        if i < len(self._names) and self._names[i] == (norm, code):
+            del self._names[i]
+            del self._name_keys[i]
+        for tok in set(norm.split()):
+            codes = self._tokens.get(tok)
+            if codes is not None:
+                codes.discard(code)
+                if not codes:
+                    del self._tokens[tok]
+                    del self._token_keys[bisect_left(self._token_keys, tok)]
+
+    def _rebuild(self):
+        self.isin = {}
+        self._tokens = {}
+        names = []
+        for code, (name, po, ri) in self.meta.items():
+            for isin in (po, ri):
+                if isin:
+                    self.isin[isin] = code
+            norm = normalize_name(name)
+            names.append((norm, code))
+            for tok in set(norm.split()):
+                self._tokens.setdefault(tok, set()).add(code)
+        names.sort()
+        self._names = names
+        self._name_keys = [n for n, _ in names]
+        self._token_keys = sorted(self._tokens)
+
+    def update(self, metas: Dict[int, SchemeMeta], asof: Optional[datetime] = None) -> List[int]:
+        """Apply scheme metadata taken from NAV date asof
+
+        A scheme is only updated when asof is the same or newer than the
+        date its current metadata came from (a missing date compares
+        lowest); only new or changed schemes are re-indexed.
+        """
+        since = asof or datetime.min
+        changed = [
+            code for code, meta in metas.items()
+            if self.meta.get(code) != meta and since >= (self.asof.get(code) or datetime.min)
+        ]
+        for code in changed:
+            self.asof[code] = asof
+        if len(changed) > _BULK_REBUILD:
+            # Sorting once beats many list inserts (first load, full archives)
+            for code in changed:
+                self.meta[code] = metas[code]
+            self._rebuild()
+        else:
+            for code in changed:
+                old = self.meta.get(code)
+                if old is not None:
+                    self._remove(code, old)
+                self.meta[code] = metas[code]
+                self._add(code, metas[code])
+        self.dirty.update(changed)
+        return changed
+
+    def by_isin(self, isin: str) -> Optional[int]:
+        return self.isin.get(isin.strip().upper())
+
+    def by_name_prefix(self, prefix: str, limit: int = 20) -> List[int]:
+        lo, hi = _prefix_range(self._name_keys, normalize_name(prefix))
+        return [code for _, code in self._names[lo:min(hi, lo + limit)]]
+
+    def by_tokens(self, query: str, limit: int = 20) -> List[int]:
+        """Schemes whose name has a token starting with each query word"""
+        result: Optional[Set[int]] = None
+        # Most selective (longest) words first keeps the intersections small
+        for word in sorted(set(normalize_name(query).split()), key=len, reverse=True):
+            lo, hi = _prefix_range(self._token_keys, word)
+            codes: Set[int] = set()
+            for tok in self._token_keys[lo:hi]:
+                codes |= self._tokens[tok]
+            result = codes if result is None else result & codes
+            if not result:
+                return []
+        return sorted(result or ())[:limit]
+
+    def lookup(self, query: str, limit: int = 20) -> List[int]:
+        """Resolve an ISIN, scheme code, name prefix or name words to scheme codes"""
+        query = query.strip()
+        code = self.by_isin(query)
+        if code is not None:
+            return [code]
+        if query.isdigit() and int(query) in self.meta:
+            return [int(query)]
+        codes = self.by_name_prefix(query, limit)
+        if len(codes) < limit:
+            codes += [c for c in self.by_tokens(query, limit) if c not in codes]
+        return codes[:limit]
+
+    def save(self, db: Optional[DB] = None, path: Path = INDEX_PATH) -> int:
+        """Upsert dirty schemes into mutualFunds.scheme_meta, then write the local file
+
+        MongoDB goes first: if it fails the file is left as it was and the
+        changes are re-detected against it on the next run.
+        """
+        if not self.dirty and path.exists():
+            return 0
+        written = 0
+        if db is not None and self.dirty:
+            coll = db.db_mutual["scheme_meta"]
+            coll.create_index([("Scheme Code", ASCENDING)], unique=True)
+            coll.create_index([("isinPo", ASCENDING)])
+            coll.create_index([("isinRi", ASCENDING)])
+            coll.create_index([("nameNorm", ASCENDING)])
+            for batch in chunked(sorted(self.dirty), 5000):
+                ops = []
+                for code in batch:
+                    name, po, ri = self.meta[code]
+                    ops.append(UpdateOne({"Scheme Code": code}, {"$set": {
+                        "Scheme Name": name,
+                        "isinPo": po,
+                        "isinRi": ri,
+                        "nameNorm": normalize_name(name),
+                        "asOf": self.asof.get(code),
+                    }}, upsert=True))
+                coll.bulk_write(ops, ordered=False)
+                written += len(ops)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as fh:
+            json.dump({str(c): [*m, _date_str(self.asof.get(c))] for c, m in self.meta.items()}, fh,
+                      separators=(",", ":"))
+        tmp.replace(path)
+        self.dirty.clear()
+        return written
+
+    @classmethod
+    def load(cls, db: Optional[DB] = None, path: Path = INDEX_PATH) -> "SchemeIndex":
+        """Load from the local file, falling back to mutualFunds.scheme_meta"""
+        index = cls()
+        metas: Dict[int, SchemeMeta] = {}
+        dates: Dict[int, Optional[datetime]] = {}
+        if path.exists():
+            with open(path) as fh:
+                for c, m in json.load(fh).items():
+                    # Files written before NAV dates were kept have no fourth field
+                    metas[int(c)] = tuple(m[:3])
+                    dates[int(c)] = _parse_date(m[3] if len(m) > 3 else None)
+        elif db is not None:
+            for d in db.db_mutual["scheme_meta"].find({}, {"_id": 0}):
+                metas[d["Scheme Code"]] = (d.get("Scheme Name") or "", d.get("isinPo"), d.get("isinRi"))
+                dates[d["Scheme Code"]] = d.get("asOf")
+        index.update(metas)
+        index.asof = dates
+        index.dirty.clear()
+        return index
+
+
+def _date_str(val: Optional[datetime]) -> Optional[str]:
+    return val.strftime("%Y-%m-%d") if val else None
+
+
+def _parse_date(val: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(val, "%Y-%m-%d") if val else None
+
+
+def scheme_meta_from_records(records: Iterable[Tuple[Any, Any, Any, Any]]) -> Dict[int, SchemeMeta]:
+    """Build {code: (name, isin_po, isin_ri)} from (code, name, isin_po, isin_ri) tuples"""
+    metas: Dict[int, SchemeMeta] = {}
+    for code, name, po, ri in records:
+        try:
+            code = int(code)
+        except (TypeError, ValueError):
+            continue
+        metas[code] = (str(name or "").strip(), clean_isin(po), clean_isin(ri))
+    return metas
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Look up schemes by ISIN, code or name")
+    parser.add_argument("query")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    db = DB(Config.from_env()) if not INDEX_PATH.exists() else None
+    index = SchemeIndex.load(db)
+    for code in index.lookup(args.query, args.limit):
+        name, po, ri = index.meta[code]
+        print(f"{code}\t{name}\t{po or ''}\t{ri or ''}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
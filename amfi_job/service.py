@@ -0,0 +1,294 @@
+"""Local read-only HTTP/JSON query service over NAV and value data.
+
+    python -m amfi_job.service --port 8765
+
+Endpoints (GET):
+    /health
+    /schemes/<code>/nav?from=YYYY-MM-DD&to=YYYY-MM-DD   time series of nav/value
+    /latest-nav/<code>                                  latest_nav document
+    /value-table?days=10                                family x date value table (days <= 90)
+    /weekly-summary?year=&week=&scheme=                 weekly_nav_summary rows
+POST /invalidate clears the cache.
+
+Only the parameters listed above are read; others are ignored. Responses
+are cached in an LRU keyed by path and the parsed parameters. The cache is
+cleared whenever ingest_state shows a newer ingest, which the job records
+once the daily_movement writes, weekly summary and analytics are done.
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import re
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .config import Config
+from .db import DB
+
+MAX_TABLE_DAYS = 90
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with a fixed number of entries
+
+    generation is bumped by every clear(); a put made with an older
+    generation is dropped so a value computed before an invalidation is
+    never cached after it.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, generation: Optional[int] = None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _jsonable(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return v.strftime("%Y-%m-%d")
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, dict):
+        return {str(k): _jsonable(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_jsonable(x) for x in v]
+    return v
+
+
+def _parse_date(val: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(val, "%Y-%m-%d") if val else None
+
+
+def _table_days(val: str) -> int:
+    return min(max(int(val), 1), MAX_TABLE_DAYS)
+
+
+class QueryService:
+    """Query handlers plus the response cache and its invalidation watcher"""
+
+    def __init__(self, db: DB, cache_size: int = 1024, poll_interval: float = 5.0):
+        self.db = db
+        self.cache = LRUCache(cache_size)
+        self.poll_interval = poll_interval
+        self._updated_at = db.get_daily_movement_updated_at()
+        self._stop = threading.Event()
+        # pattern -> (handler, {query parameter: parser})
+        self.routes: Dict[str, Tuple[Callable[..., Any], Dict[str, Callable[[str], Any]]]] = {
+            r"/schemes/(\d+)/nav": (self.scheme_nav, {"from": _parse_date, "to": _parse_date}),
+            r"/latest-nav/(\d+)": (self.latest_nav, {}),
+            r"/value-table": (self.value_table, {"days": _table_days}),
+            r"/weekly-summary": (self.weekly_summary, {"year": int, "week": int, "scheme": int}),
+        }
+
+    def start_watcher(self):
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                updated_at = self.db.get_daily_movement_updated_at()
+            except Exception as e:
+                print(f"[ERROR] Could not read ingest_state: {e}", file=sys.stderr)
+                continue
+            if updated_at != self._updated_at:
+                self._updated_at = updated_at
+                self.cache.clear()
+
+    def handle(self, path: str, query: Dict[str, str]) -> Optional[bytes]:
+        """Return the JSON body for a GET request, or None if nothing matches
+
+        Bad parameter values raise ValueError.
+        """
+        if path == "/health":
+            return json.dumps(self.health()).encode()
+        for pattern, (fn, params) in self.routes.items():
+            m = re.fullmatch(pattern, path)
+            if not m:
+                continue
+            args = {}
+            for name, parse in params.items():
+                if name in query:
+                    try:
+                        args[name] = parse(query[name])
+                    except ValueError:
+                        raise ValueError(f"invalid value for {name!r}: {query[name]!r}") from None
+            key = (path, tuple(sorted(args.items())))
+            # Read before the lookup so a clear() during compute discards the result
+            generation = self.cache.generation
+            body = self.cache.get(key)
+            if body is not None:
+                return body
+            result = fn(*m.groups(), args)
+            if result is None:
+                # Unknown resource: 404, and not cached
+                return None
+            body = json.dumps(_jsonable(result)).encode()
+            self.cache.put(key, body, generation)
+            return body
+        return None
+
+    def health(self):
+        return {"ok": True, "cached": len(self.cache), "hits": self.cache.hits, "misses": self.cache.misses}
+
+    def scheme_nav(self, code: str, args: Dict[str, Any]):
+        date_filter: Dict[str, Any] = {"$ne": None}
+        start, end = args.get("from"), args.get("to")
+        if start:
+            date_filter["$gte"] = start
+        if end:
+            date_filter["$lte"] = end
+        cursor = self.db.daily_movement.find(
+            {"Scheme Code": int(code), "Date": date_filter},
+            {"_id": 0, "Date": 1, "nav": 1, "value": 1}
+        ).sort("Date", 1)
+        return {"schemeCode": int(code), "points": list(cursor)}
+
+    def latest_nav(self, code: str, args: Dict[str, Any]):
+        return self.db.latest_nav.find_one({"Scheme Code": int(code)}, {"_id": 0})
+
+    def value_table(self, args: Dict[str, Any]):
+        from .report_table import build_value_table
+
+        table = build_value_table(self.db, days=args.get("days", 10))
+        if table is None:
+            return {"dates": [], "rows": []}
+        date_cols = [c for c in table.columns if c != "Change"]
+        dates = [c.strftime("%Y-%m-%d") if hasattr(c, "strftime") else str(c) for c in date_cols]
+        rows = []
+        for name, row in table.iterrows():
+            rows.append({
+                "scheme": str(name),
+                "change": int(row["Change"]),
+                "values": {d: int(row[c]) for d, c in zip(dates, date_cols)},
+            })
+        return {"dates": dates, "rows": rows}
+
+    def weekly_summary(self, args: Dict[str, Any]):
+        # Same target as the $merge stage in DB.generate_weekly_summary
+        coll = self.db.client["reporting"]["weekly_nav_summary"]
+        if "year" in args and "week" in args:
+            year, week = args["year"], args["week"]
+        else:
+            latest = self.db.get_latest_weekly_summary_week()
+            if latest is None:
+                return []
+            year, week = latest
+        filt: Dict[str, Any] = {"Year": year, "WeekOfYear": week}
+        if "scheme" in args:
+            filt["SchemeCode"] = args["scheme"]
+        return list(coll.find(filt, {"_id": 0}).sort("SchemeCode", 1))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: QueryService
+    quiet = True
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            body = self.service.handle(url.path.rstrip("/") or "/", query)
+        except ValueError as e:
+            self._send(400, json.dumps({"error": str(e)}).encode())
+            return
+        except Exception as e:
+            self._send(500, json.dumps({"error": str(e)}).encode())
+            return
+        if body is None:
+            self._send(404, b'{"error": "not found"}')
+        else:
+            self._send(200, body)
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip("/") == "/invalidate":
+            self.service.cache.clear()
+            self._send(200, b'{"ok": true}')
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog (5) drops connections under concurrent load
+    request_queue_size = 128
+
+
+def make_server(service: QueryService, host: str = "127.0.0.1", port: int = 8765, quiet: bool = True) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {"service": service, "quiet": quiet})
+    return _Server((host, port), handler)
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Read-only JSON query service over daily_movement")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=1024, help="Max cached responses")
+    parser.add_argument("--pool-size", type=int, default=32, help="MongoDB connection pool size")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between ingest_state checks")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    db = DB(Config.from_env(), maxPoolSize=args.pool_size)
+    service = QueryService(db, cache_size=args.cache_size, poll_interval=args.poll_interval)
+    service.start_watcher()
+    server = make_server(service, args.host, args.port, quiet=not args.verbose)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
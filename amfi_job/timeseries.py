@@ -0,0 +1,65 @@
+from __future__ import annotations
+import argparse
+import sys
+from typing import Optional
+
+from .config import Config
+from .db import DB
+from .utils import chunked
+
+
+def migrate_daily_movement(db: DB, source: str, target: str, batch_size: int = 5000, verbose: bool = True) -> dict:
+    """Stream documents from a plain daily_movement collection into a time-series one
+
+    Documents are read with a cursor sorted by (Date, Scheme Code) so each batch spans
+    few dates, and written in batches; memory use stays bounded by batch_size.
+    Re-running the migration is safe: each batch goes through the idempotent
+    delete-and-insert path used by ingest.
+    """
+    src = db.db_mutual[source]
+    db.ensure_daily_movement_timeseries(target)
+
+    cursor = src.find(
+        {"Date": {"$ne": None}},
+        {"_id": 0},
+        sort=[("Date", 1), ("Scheme Code", 1)],
+        batch_size=batch_size,
+        no_cursor_timeout=True,
+        allow_disk_use=True,
+    )
+    copied = 0
+    try:
+        for batch in chunked(cursor, batch_size):
+            db.replace_daily_movement_timeseries(batch, target)
+            copied += len(batch)
+            if verbose:
+                print(f"Migrated {copied} documents into {target}...")
+    finally:
+        cursor.close()
+
+    if verbose:
+        print(f"Done. {copied} documents copied from {source} to {target}")
+    return {"copied": copied, "source": source, "target": target}
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="daily_movement time-series storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    mig = sub.add_parser("migrate", help="Copy an existing daily_movement collection into a time-series collection")
+    mig.add_argument("--source", default="daily_movement")
+    mig.add_argument("--target", default="daily_movement_ts")
+    mig.add_argument("--batch-size", type=int, default=5000)
+
+    args = parser.parse_args(argv)
+    db = DB(Config.from_env())
+    if args.command == "migrate":
+        print(migrate_daily_movement(db, args.source, args.target, args.batch_size))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,101 @@
+"""Compare the pandas and fast ingest engines on a local AMFI NAV file.
+
+Each engine runs in a fresh interpreter so the timing includes imports
+(cold start), which dominates a nightly single-date run. The generated
+documents are compared for equality. No upsert is performed.
+
+    python -m benchmarks.bench_ingest /path/to/nav.txt
+    python -m benchmarks.bench_ingest /path/to/nav.txt --synthetic-active
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+_WORKER = r"""
+import pickle, sys, time
+t0 = time.perf_counter()
+engine, nav_path, active_path, out_path = sys.argv[1:5]
+with open(active_path, "rb") as fh:
+    active = pickle.load(fh)
+with open(nav_path, encoding="utf-8", errors="replace") as fh:
+    text = fh.read()
+if engine == "fast":
+    from amfi_job.fast_ingest import parse_nav_rows, build_daily_movement_docs
+    docs = build_daily_movement_docs(parse_nav_rows(text), active)
+else:
+    from amfi_job.amfi_parse import parse_nav_text, minimal_nav
+    from amfi_job.merge import merge_nav_with_active, to_daily_movement_docs
+    docs = to_daily_movement_docs(merge_nav_with_active(minimal_nav(parse_nav_text(text)), active))
+elapsed = time.perf_counter() - t0
+with open(out_path, "wb") as fh:
+    pickle.dump({"elapsed": elapsed, "docs": [dict(d) for d in docs]}, fh)
+"""
+
+
+def _load_active(nav_path: str, synthetic: bool) -> list:
+    if synthetic:
+        from amfi_job.fast_ingest import parse_nav_rows
+        with open(nav_path, encoding="utf-8", errors="replace") as fh:
+            rows = parse_nav_rows(fh.read())
+        return [{"categoryCode": r.scheme_code, "activeUnits": 100.0} for r in rows]
+    from amfi_job.config import Config
+    from amfi_job.db import DB
+    return DB(Config.from_env()).get_active_schemes()
+
+
+def _normalize(doc: dict) -> dict:
+    out = {}
+    for k, v in doc.items():
+        if isinstance(v, float) and math.isnan(v):
+            v = "NaN"
+        elif hasattr(v, "to_pydatetime"):
+            v = v.to_pydatetime()
+        out[k] = v
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("nav_file")
+    parser.add_argument("--synthetic-active", action="store_true", help="Treat every scheme in the file as active instead of reading MongoDB")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    active = _load_active(args.nav_file, args.synthetic_active)
+    with tempfile.TemporaryDirectory() as tmp:
+        active_path = f"{tmp}/active.pkl"
+        with open(active_path, "wb") as fh:
+            pickle.dump(active, fh)
+
+        outputs = {}
+        for engine in ("pandas", "fast"):
+            walls, inner = [], []
+            for _ in range(args.repeat):
+                out_path = f"{tmp}/{engine}.pkl"
+                t0 = time.perf_counter()
+                subprocess.run([sys.executable, "-c", _WORKER, engine, args.nav_file, active_path, out_path],
+                               check=True, stdout=subprocess.DEVNULL)
+                walls.append(time.perf_counter() - t0)
+                with open(out_path, "rb") as fh:
+                    res = pickle.load(fh)
+                inner.append(res["elapsed"])
+            outputs[engine] = res["docs"]
+            print(json.dumps({
+                "engine": engine,
+                "docs": len(res["docs"]),
+                "cold_start_s": round(min(walls), 3),
+                "import_and_ingest_s": round(min(inner), 3),
+            }))
+
+    same = [_normalize(d) for d in outputs["pandas"]] == [_normalize(d) for d in outputs["fast"]]
+    print(f"Documents identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
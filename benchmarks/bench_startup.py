@@ -0,0 +1,56 @@
+"""Measure interpreter cold-start import time for the job entry points.
+
+Each import runs in a fresh interpreter and the best of --repeat runs is
+reported, alongside which heavy modules ended up loaded.
+
+    python -m benchmarks.bench_startup
+"""
+from __future__ import annotations
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = [
+    "amfi_job.config",
+    "amfi_job.db",
+    "amfi_job.job",
+    "amfi_job.fast_ingest",
+    "amfi_job.merge",
+    "amfi_job.report_table",
+]
+
+HEAVY = ("pandas", "numpy", "requests", "dotenv", "pymongo")
+
+_PROBE = r"""
+import importlib, json, sys, time
+t0 = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - t0
+heavy = sorted({m.split(".")[0] for m in sys.modules} & set(sys.argv[2].split(",")))
+print(json.dumps({"seconds": elapsed, "heavy": heavy}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE, module, ",".join(HEAVY)],
+                             check=True, capture_output=True, text=True).stdout
+        res = json.loads(out.strip().splitlines()[-1])
+        if best is None or res["seconds"] < best["seconds"]:
+            best = res
+    return {"module": module, "import_ms": round(best["seconds"] * 1000, 1), "loaded": best["heavy"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+    for module in args.modules:
+        print(json.dumps(measure(module, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare plain vs time-series daily_movement storage.
+
+Reports storage size and range-query latency for two collections in the
+mutualFunds database, e.g. after running the migration:
+
+    python -m amfi_job.timeseries migrate --target daily_movement_ts
+    python -m benchmarks.bench_timeseries --plain daily_movement --timeseries daily_movement_ts
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+from amfi_job.config import Config
+from amfi_job.db import DB
+
+
+def storage_stats(db: DB, name: str) -> dict:
+    stats = db.db_mutual.command("collStats", name)
+    return {
+        "count": stats.get("count"),
+        "size": stats.get("size"),
+        "storageSize": stats.get("storageSize"),
+        "totalIndexSize": stats.get("totalIndexSize"),
+    }
+
+
+def time_range_query(coll, start, end, repeat: int, scheme_code=None) -> dict:
+    query = {"Date": {"$gte": start, "$lte": end}}
+    if scheme_code is not None:
+        query["Scheme Code"] = scheme_code
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = sum(1 for _ in coll.find(query, {"_id": 0, "Scheme Code": 1, "Date": 1, "nav": 1, "value": 1}))
+        timings.append((time.perf_counter() - t0) * 1000)
+    return {
+        "rows": rows,
+        "median_ms": round(statistics.median(timings), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plain", default="daily_movement")
+    parser.add_argument("--timeseries", default="daily_movement_ts")
+    parser.add_argument("--days", type=int, default=30, help="Width of the range query window")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = DB(Config.from_env())
+    latest = db.db_mutual[args.plain].find_one({"Date": {"$ne": None}}, sort=[("Date", -1)])
+    if not latest:
+        print("No data found.")
+        return
+    end = latest["Date"]
+    start = end - timedelta(days=args.days)
+    scheme_code = latest.get("Scheme Code")
+
+    for name in (args.plain, args.timeseries):
+        coll = db.db_mutual[name]
+        print(f"== {name}")
+        print("  storage:", storage_stats(db, name))
+        print(f"  range {args.days}d (all schemes):", time_range_query(coll, start, end, args.repeat))
+        print(f"  range {args.days}d (scheme {scheme_code}):", time_range_query(coll, start, end, args.repeat, scheme_code))
+
+
+if __name__ == "__main__":
+    main()
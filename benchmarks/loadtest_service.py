@@ -0,0 +1,115 @@
+"""Concurrent load test for the local query service.
+
+Start the service against a local mongod first, then run:
+
+    MONGODB_URI=mongodb://localhost:27017 python -m amfi_job.service --port 8765
+    python -m benchmarks.loadtest_service --url http://127.0.0.1:8765 --concurrency 32 --requests 5000
+
+Scheme codes come from --codes or are read from latest_nav. The run has
+two phases, reported separately per endpoint:
+
+    cold  the cache is cleared (POST /invalidate) and every distinct URL is
+          requested once, so each request is a MongoDB-backed miss
+    warm  --requests random picks from the same URLs, served from cache as
+          long as the URL set fits the service's --cache-size
+
+--ranges N adds N random from/to windows per scheme to the URL set, so
+the cold phase covers many distinct time-series queries.
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import random
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+
+def _get(url: str) -> float:
+    t0 = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=30) as resp:
+        resp.read()
+    return (time.perf_counter() - t0) * 1000
+
+
+def _percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))
+    return values[k]
+
+
+def _default_codes(limit: int = 50) -> List[int]:
+    from amfi_job.config import Config
+    from amfi_job.db import DB
+    db = DB(Config.from_env())
+    return [d["Scheme Code"] for d in db.latest_nav.find({}, {"_id": 0, "Scheme Code": 1}).limit(limit)]
+
+
+def _random_range(rng: random.Random) -> str:
+    start = date(2015, 1, 1) + timedelta(days=rng.randrange(3650))
+    end = start + timedelta(days=rng.randrange(7, 730))
+    return f"from={start:%Y-%m-%d}&to={end:%Y-%m-%d}"
+
+
+def _run(base_url: str, paths: List[str], concurrency: int) -> Tuple[List[Tuple[str, float]], float]:
+    def run(path: str):
+        return path, _get(base_url + path)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(run, paths))
+    return results, time.perf_counter() - t0
+
+
+def _report(phase: str, results: List[Tuple[str, float]], wall: float, concurrency: int):
+    by_endpoint: Dict[str, List[float]] = {}
+    for path, ms in results:
+        name = path.split("/")[1]
+        by_endpoint.setdefault(name, []).append(ms)
+    by_endpoint["ALL"] = [ms for _, ms in results]
+
+    print(f"{phase}: {len(results)} requests, concurrency {concurrency}, {len(results) / wall:.0f} req/s")
+    for name, timings in by_endpoint.items():
+        print(json.dumps({
+            "phase": phase,
+            "endpoint": name,
+            "n": len(timings),
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(_percentile(timings, 95), 2),
+            "p99_ms": round(_percentile(timings, 99), 2),
+            "max_ms": round(max(timings), 2),
+        }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5000, help="Requests in the warm phase")
+    parser.add_argument("--codes", type=int, nargs="*", help="Scheme codes to query (default: sample from latest_nav)")
+    parser.add_argument("--ranges", type=int, default=0, help="Random from/to windows per scheme added to the URL set")
+    parser.add_argument("--skip-warm", action="store_true", help="Only run the cold (cache miss) phase")
+    args = parser.parse_args()
+
+    codes = args.codes or _default_codes()
+    rng = random.Random(0)
+    paths = ["/value-table", "/weekly-summary"]
+    for c in codes:
+        paths += [f"/schemes/{c}/nav", f"/latest-nav/{c}"]
+        paths += [f"/schemes/{c}/nav?{_random_range(rng)}" for _ in range(args.ranges)]
+    paths = list(dict.fromkeys(paths))
+    rng.shuffle(paths)
+
+    urllib.request.urlopen(urllib.request.Request(f"{args.url}/invalidate", method="POST")).read()
+    _report("cold", *_run(args.url, paths, args.concurrency), args.concurrency)
+    if not args.skip_warm:
+        plan = [rng.choice(paths) for _ in range(args.requests)]
+        _report("warm", *_run(args.url, plan, args.concurrency), args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pymongo")
+
+from amfi_job.analytics import AnalyticsState, compute_metrics, extend_state
+
+
+def _nav_matrix(n_dates=600, seed=0):
+    """Business-day x scheme NAV matrix with NaN gaps and a scheme starting midway"""
+    rng = np.random.default_rng(seed)
+    dates = np.arange("2023-01-02", "2026-01-01", dtype="datetime64[D]")
+    dates = dates[np.is_busday(dates)][:n_dates]
+    codes = np.array([100, 101, 102, 103], dtype=np.int64)
+    returns = rng.normal(0.0003, 0.01, size=(len(dates), len(codes)))
+    nav = 10.0 * np.exp(np.cumsum(returns, axis=0))
+    nav[rng.random(nav.shape) < 0.05] = np.nan  # holidays / missing files
+    nav[:, 1][100:140] = np.nan  # long gap
+    nav[: len(dates) // 2, 2] = np.nan  # scheme launched midway
+    nav[len(dates) - 50:, 3] = np.nan  # scheme stopped reporting
+    return dates, codes, nav
+
+
+def _chunk(dates, codes, nav, lo, hi):
+    # load_nav_matrix only returns codes that have a NAV in the chunk
+    block = nav[lo:hi]
+    present = ~np.isnan(block).all(axis=0)
+    return dates[lo:hi], codes[present], block[:, present]
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 90, 250])
+def test_chunked_extend_matches_single_extend(chunk):
+    dates, codes, nav = _nav_matrix()
+    single = extend_state(AnalyticsState.empty(), dates, codes, nav)
+
+    chunked = AnalyticsState.empty()
+    for lo in range(0, len(dates), chunk):
+        chunked = extend_state(chunked, *_chunk(dates, codes, nav, lo, lo + chunk))
+
+    np.testing.assert_array_equal(chunked.dates, single.dates)
+    np.testing.assert_array_equal(chunked.codes, single.codes)
+    expected, actual = compute_metrics(single), compute_metrics(chunked)
+    assert actual.keys() == expected.keys()
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-12, equal_nan=True, err_msg=name)
+
+
+def test_metrics_match_hand_computed_values():
+    nan = np.nan
+    dates = np.arange("2025-01-01", "2025-01-11", dtype="datetime64[D]")
+    codes = np.array([1, 2], dtype=np.int64)
+    a = [100, 110, 99, nan, 121, 110, 120, 132, 125, 130]
+    b = [nan, nan, nan, 50, 55, nan, 44, 60, 66, 66]  # starts on 2025-01-04
+    state = extend_state(AnalyticsState.empty(), dates, codes, np.array([a, b], dtype=float).T)
+    m = compute_metrics(state)
+
+    # Scheme 1: as of 2025-01-10; a week back is 2025-01-03 (99)
+    assert m["return1d"][0] == pytest.approx(130 / 125 - 1)
+    assert m["return1w"][0] == pytest.approx(130 / 99 - 1)
+    assert m["cagr"][0] == pytest.approx((130 / 100) ** (365.25 / 9) - 1)
+    assert m["maxDrawdown"][0] == pytest.approx(99 / 110 - 1)
+    assert m["drawdown"][0] == pytest.approx(130 / 132 - 1)
+    filled = [100, 110, 99, 99, 121, 110, 120, 132, 125, 130]
+    log_ret = np.diff(np.log(filled))
+    assert m["volatility1y"][0] == pytest.approx(np.std(log_ret, ddof=1) * np.sqrt(252))
+    assert m["nav"][0] == 130
+
+    # Scheme 2: flat last day, no NAV a week back, 44 after a 55 peak
+    assert m["return1d"][1] == pytest.approx(0.0)
+    assert np.isnan(m["return1w"][1])
+    assert m["cagr"][1] == pytest.approx((66 / 50) ** (365.25 / 6) - 1)
+    assert m["maxDrawdown"][1] == pytest.approx(44 / 55 - 1)
+    assert m["drawdown"][1] == pytest.approx(0.0)
+
+    for name in ("return1m", "return1y"):
+        assert np.isnan(m[name]).all()
@@ -0,0 +1,92 @@
+import math
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from amfi_job.amfi_parse import minimal_nav, parse_nav_text
+from amfi_job.fast_ingest import build_daily_movement_docs, parse_nav_rows
+from amfi_job.merge import merge_nav_with_active, to_daily_movement_docs
+
+NAV_TEXT = """Scheme Code;ISIN Div Payout/ISIN Growth;ISIN Div Reinvestment;Scheme Name;Net Asset Value;Repurchase Price;Sale Price;Date
+
+Open Ended Schemes(Debt Scheme - Banking and PSU Fund)
+
+Aditya Birla Sun Life Mutual Fund
+
+100;INF209KA12Z1;INF209KA13Z9;Aditya Birla Banking Fund - Growth;10.5;;;28-Oct-2025
+101;INF209KA14Z7;-;Aditya Birla Banking Fund - IDCW;1,234.5678;;;28-Oct-2025
+102;-;-;Aditya Birla Liquid Fund;N.A.;;;28-Oct-2025
+103;-;-;Aditya Birla Gilt Fund;20.25;;;2025-10-28 00:00:00
+104;-;-;Aditya Birla Overnight Fund;99.1;;;28-Oct-2025
+100;INF209KA12Z1;INF209KA13Z9;Aditya Birla Banking Fund - Growth;10.75;;;28-Oct-2025
+"""
+
+HEADER = NAV_TEXT.splitlines()[0]
+
+# Every NAV integral: pandas keeps nav as int64
+INT_NAV_TEXT = HEADER + """
+100;INF209KA12Z1;INF209KA13Z9;Aditya Birla Banking Fund - Growth;10;;;28-Oct-2025
+101;INF209KA14Z7;-;Aditya Birla Banking Fund - IDCW;1,234;;;28-Oct-2025
+103;-;-;Aditya Birla Gilt Fund;+20;;;28-Oct-2025
+"""
+
+# Integral NAVs, but the section heading's empty NAV makes the column float64
+INT_NAV_SECTION_TEXT = HEADER + """
+
+Aditya Birla Sun Life Mutual Fund
+
+100;INF209KA12Z1;INF209KA13Z9;Aditya Birla Banking Fund - Growth;10;;;28-Oct-2025
+101;INF209KA14Z7;-;Aditya Birla Banking Fund - IDCW;11;;;28-Oct-2025
+"""
+
+
+def _pandas_docs(text, active):
+    nav_df = minimal_nav(parse_nav_text(text))
+    return to_daily_movement_docs(merge_nav_with_active(nav_df, active))
+
+
+def _fast_docs(text, active):
+    return build_daily_movement_docs(parse_nav_rows(text), active)
+
+
+def _comparable(value):
+    # NaN != NaN, and int vs float units must be told apart; pd.Timestamp
+    # is a datetime and is stored as one
+    if isinstance(value, float) and math.isnan(value):
+        return "nan"
+    if isinstance(value, datetime):
+        return ("datetime", value)
+    return (type(value).__name__, value)
+
+
+@pytest.mark.parametrize("text", [NAV_TEXT, INT_NAV_TEXT, INT_NAV_SECTION_TEXT], ids=["mixed", "int", "int-section"])
+@pytest.mark.parametrize("active", [
+    # Every scheme has integer units
+    [
+        {"categoryCode": 100, "activeUnits": 1000},
+        {"categoryCode": "101", "activeUnits": 250},
+        {"categoryCode": 102, "activeUnits": 10},
+        {"categoryCode": 103, "activeUnits": 7},
+    ],
+    # One scheme without units turns the column into float64
+    [
+        {"categoryCode": 100, "activeUnits": 1000},
+        {"categoryCode": 101, "activeUnits": 250.5},
+        {"categoryCode": 103},
+        {"categoryCode": 104, "activeUnits": None},
+        {"categoryCode": 999, "activeUnits": 5},
+    ],
+    # String units keep an object column
+    [
+        {"categoryCode": 100, "activeUnits": "1,000"},
+        {"categoryCode": 101},
+        {"categoryCode": 104, "activeUnits": None},
+    ],
+])
+def test_fast_engine_matches_pandas(text, active):
+    expected = _pandas_docs(text, active)
+    actual = _fast_docs(text, active)
+    assert [{k: _comparable(v) for k, v in d.items()} for d in actual] == \
+        [{k: _comparable(v) for k, v in d.items()} for d in expected]
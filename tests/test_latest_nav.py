@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip("pymongo")
+
+from amfi_job import latest_nav
+from amfi_job.latest_nav import LatestNavCache
+
+
+class _Cursor(list):
+    def sort(self, key, direction):
+        return _Cursor(sorted(self, key=lambda d: d[key], reverse=direction < 0))
+
+
+class _FakeLatestNav:
+    """Just enough of a pymongo collection for LatestNavCache, recording queries"""
+
+    def __init__(self, docs):
+        self.docs = {d["Scheme Code"]: d for d in docs}
+        self.queries = []
+
+    def find(self, filt, projection=None):
+        self.queries.append(filt)
+        if not filt:
+            return _Cursor(self.docs.values())
+        return _Cursor(self.docs[c] for c in filt["Scheme Code"]["$in"] if c in self.docs)
+
+
+class _FakeDB:
+    def __init__(self, docs):
+        self.latest_nav = _FakeLatestNav(docs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(latest_nav.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _db():
+    return _FakeDB([{"Scheme Code": c, "nav": float(c)} for c in (1, 2, 3)])
+
+
+def test_misses_are_batched_and_cached(clock):
+    db = _db()
+    cache = LatestNavCache(db, ttl=60)
+    assert cache.get_many([1, 2, 99]) == {1: {"Scheme Code": 1, "nav": 1.0}, 2: {"Scheme Code": 2, "nav": 2.0}, 99: None}
+    assert db.latest_nav.queries == [{"Scheme Code": {"$in": [1, 2, 99]}}]
+    # Hits, including the cached unknown code, need no query; only 3 is fetched
+    assert cache.get_many([1, 99, 3])[3]["nav"] == 3.0
+    assert db.latest_nav.queries[1:] == [{"Scheme Code": {"$in": [3]}}]
+    assert cache.get(2)["nav"] == 2.0
+    assert len(db.latest_nav.queries) == 2
+
+
+def test_ttl_expiry(clock):
+    db = _db()
+    cache = LatestNavCache(db, ttl=60)
+    cache.get(1)
+    clock[0] += 59
+    cache.get(1)
+    assert len(db.latest_nav.queries) == 1
+    db.latest_nav.docs[1] = {"Scheme Code": 1, "nav": 1.5}
+    clock[0] += 2
+    assert cache.get(1)["nav"] == 1.5
+    assert len(db.latest_nav.queries) == 2
+
+
+def test_expired_entries_and_unknown_codes_are_pruned(clock):
+    db = _db()
+    cache = LatestNavCache(db, ttl=60, maxsize=100)
+    cache.get_many(range(1000, 1050))
+    clock[0] += 61
+    cache.get(1)
+    assert len(cache) == 1
+    cache.get_many(range(2000, 2500))
+    assert len(cache) == 100
+    # The most recently stored entries are kept, the oldest dropped
+    cache.get(2499)
+    assert db.latest_nav.queries[-1] == {"Scheme Code": {"$in": list(range(2000, 2500))}}
+    cache.get(2000)
+    assert db.latest_nav.queries[-1] == {"Scheme Code": {"$in": [2000]}}
+
+
+def test_invalidate(clock):
+    db = _db()
+    cache = LatestNavCache(db, ttl=60)
+    assert [d["Scheme Code"] for d in cache.snapshot()] == [1, 2, 3]
+    cache.get_many([1, 2, 3])
+    assert len(db.latest_nav.queries) == 1
+
+    cache.invalidate([2])
+    cache.get_many([1, 2, 3])
+    assert db.latest_nav.queries[-1] == {"Scheme Code": {"$in": [2]}}
+
+    cache.invalidate()
+    assert len(cache) == 0
+    cache.get(1)
+    assert db.latest_nav.queries[-1] == {"Scheme Code": {"$in": [1]}}
@@ -0,0 +1,129 @@
+import random
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+from amfi_job.scheme_index import SchemeIndex
+
+WORDS = ["aditya", "birla", "axis", "bank", "banking", "psu", "debt", "liquid", "gilt", "growth",
+         "idcw", "dividend", "direct", "plan", "regular", "fund", "hdfc", "index", "nifty", "50"]
+
+
+def _isin(i):
+    return f"INF{i:08d}0"
+
+
+def _state(index):
+    return index._names, index._name_keys, index._token_keys, index._tokens, index.isin
+
+
+def _rebuilt(index):
+    fresh = SchemeIndex()
+    fresh.meta = dict(index.meta)
+    fresh._rebuild()
+    return fresh
+
+
+def test_incremental_updates_match_rebuild():
+    rng = random.Random(0)
+    index = SchemeIndex()
+    meta = {}
+    fresh_isins = iter(range(10_000))
+    for _ in range(300):
+        batch = rng.sample(range(60), rng.randint(1, 8))
+        # Reassign the batch's own ISINs among themselves plus a few new ones,
+        # so ISINs move, swap or drop between schemes but stay unique overall
+        pool = [i for code in batch for i in meta.get(code, ("", None, None))[1:] if i]
+        pool += [_isin(next(fresh_isins)) for _ in range(rng.randint(0, 3))]
+        pool += [None] * (2 * len(batch))
+        rng.shuffle(pool)
+        updates = {}
+        for code in batch:
+            name = " ".join(rng.sample(WORDS, rng.randint(1, 5)))
+            updates[code] = (name, pool.pop(), pool.pop())
+        meta.update(updates)
+        index.update(updates)
+        assert _state(index) == _state(_rebuilt(index))
+    assert index.meta == meta
+
+
+def test_bulk_update_matches_incremental():
+    metas = {code: (f"Scheme {code} fund growth", _isin(code), None) for code in range(1500)}
+    bulk = SchemeIndex()
+    bulk.update(metas)
+    incremental = SchemeIndex()
+    for code, m in metas.items():
+        incremental.update({code: m})
+    assert _state(bulk) == _state(incremental)
+
+
+def test_rename_drops_old_tokens():
+    index = SchemeIndex()
+    index.update({1: ("Alpha Dividend Plan", None, None), 2: ("Gamma Plan", None, None)})
+    index.update({1: ("Beta IDCW Plan", None, None)})
+    assert "alpha" not in index._tokens and "dividend" not in index._token_keys
+    assert index._tokens["plan"] == {1, 2}
+    assert index.by_tokens("alpha") == [] and index.by_tokens("beta") == [1]
+    assert index.by_name_prefix("alpha") == []
+    assert _state(index) == _state(_rebuilt(index))
+
+
+def test_isin_move_and_swap():
+    a, b, c = _isin(1), _isin(2), _isin(3)
+    index = SchemeIndex()
+    index.update({1: ("One", a, None), 2: ("Two", b, None)})
+    # Swap
+    index.update({1: ("One", b, None), 2: ("Two", a, None)})
+    assert index.by_isin(a) == 2 and index.by_isin(b) == 1
+    # Move: 2 takes 1's ISIN in the same batch, processed before 1 lets it go
+    index.update({2: ("Two", b, None), 1: ("One", c, None)})
+    assert index.by_isin(b) == 2 and index.by_isin(c) == 1 and index.by_isin(a) is None
+    assert _state(index) == _state(_rebuilt(index))
+
+
+def test_older_metadata_is_ignored():
+    index = SchemeIndex()
+    index.update({1: ("Fund IDCW", _isin(1), None)}, datetime(2026, 1, 5))
+    assert index.update({1: ("Fund Dividend", _isin(9), None)}, datetime(2019, 6, 1)) == []
+    assert index.meta[1] == ("Fund IDCW", _isin(1), None) and index.by_isin(_isin(9)) is None
+    assert index.update({1: ("Fund IDCW Plan", _isin(1), None)}, datetime(2026, 1, 5)) == [1]
+    assert index.asof[1] == datetime(2026, 1, 5)
+
+
+def test_save_load_round_trip(tmp_path):
+    path = tmp_path / "scheme_index.json"
+    index = SchemeIndex()
+    index.update({
+        1: ("Axis Bank Fund", _isin(1), _isin(2)),
+        2: ("HDFC Axis Index", None, None),
+    }, datetime(2025, 10, 28))
+    index.update({3: ("Gilt Fund", _isin(3), None)})
+    index.save(path=path)
+    assert not index.dirty
+
+    loaded = SchemeIndex.load(path=path)
+    assert loaded.meta == index.meta
+    assert loaded.asof == index.asof
+    assert _state(loaded) == _state(index)
+    assert not loaded.dirty
+
+
+def test_lookup_order():
+    index = SchemeIndex()
+    index.update({
+        7: ("Axis Bank Fund", _isin(7), None),
+        8: ("HDFC Axis Index", None, None),
+        9: ("Axis Bluechip", None, None),
+        42: ("Nifty 50 Index", None, None),
+    })
+    # Exact ISIN, case-insensitive
+    assert index.lookup(_isin(7).lower()) == [7]
+    # Scheme code
+    assert index.lookup("42") == [42]
+    # Name prefix matches first (in name order), then token matches
+    assert index.lookup("axis") == [7, 9, 8]
+    assert index.lookup("axis", limit=2) == [7, 9]
+    assert index.lookup("index") == [8, 42]
+    assert index.lookup("no such fund") == []